@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import warnings
 from visualizations.ratings.ratings_scatter import plot_ratings_scatter
 from visualizations.ratings.ratings_histogram import plot_ratings_histogram
@@ -27,25 +26,53 @@ from visualizations.studios.studio_radar import plot_studio_rating_radar
 from visualizations.languages.popular_languages import plot_popular_languages
 from visualizations.languages.countries_map import plot_popular_countries_map
 from utils import ORANGE, GREEN, BLUE
-from scrapers.scrape_films import get_films
-from scrapers.scrape_diary import get_diary_entries
+from dataset.schema import process_film_data, process_diary_data, decode_film_data, dataset_fingerprint
+from dataset.entities import FilmEntities
+from dataset.filter_index import FilterIndex
+from visualizations.figure_cache import get_figure_cache, get_figure_pool, figure_key
+from visualizations.plotly_spec import draw_figure
+from scrapers.scrape_profile import iter_profile
+from scrapers.sync_profile import sync_profile, get_profile_store
 
 warnings.filterwarnings("ignore", message=".*missing ScriptRunContext.*")
 
 st.set_page_config(page_title="Boxd Office", page_icon="🍿", layout="centered")
 
-def process_diary_data(diary_entries):
-    diary_df = pd.DataFrame(diary_entries)
-    diary_df['date'] = pd.to_datetime(diary_df['date'], format='%d %b %Y', errors='coerce').dt.normalize()
-    diary_df['year'] = pd.to_numeric(diary_df['year'], errors='coerce')
-    return diary_df
+PREVIEW_EVERY = 4   # redraw the preview charts every this many batches of films
+SECTIONS = ["Likes & Ratings", "Diary", "Genres & Themes", "Decades", "Obscurity", "Runtime", "Actors", "Directors", "Studios", "Languages & Countries"]
+ALL_SECTIONS = "All sections"
 
-def process_film_data(films_data):
-    films_df = pd.DataFrame(films_data)
-    for col in ['genres', 'themes', 'cast', 'directors', 'studios', 'countries']:
-        films_df[col] = films_df[col].apply(lambda x: x if isinstance(x, list) else [])
-    films_df['year'] = pd.to_numeric(films_df['year'], errors='coerce')
-    return films_df
+def render_preview(films_df, key):
+    film_entities = FilmEntities(films_df)
+    st.write(f"Loaded {len(films_df)} films so far...")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(plot_ratings_histogram(films_df, []), use_container_width=True, key=f"preview-ratings-{key}")
+    with col2:
+        st.plotly_chart(plot_liked_pie(films_df), use_container_width=True, key=f"preview-liked-{key}")
+    st.plotly_chart(plot_popular_genres(films_df, film_entities), use_container_width=True, key=f"preview-genres-{key}")
+
+def load_profile(username):
+    # films stream in as their details finish, so a preview of the dashboard shows up
+    # while the rest load; the diary is scraped alongside on the same engine
+    preview = st.empty()
+    films_data = []
+    diary_entries = []
+    batches = 0
+    for kind, data in iter_profile(username):
+        if kind == 'diary':
+            diary_entries = data
+            continue
+        if kind == 'warning':
+            st.warning(data)
+            continue
+        films_data.extend(data)
+        if batches % PREVIEW_EVERY == 0:
+            with preview.container():
+                render_preview(process_film_data(films_data), batches)
+        batches += 1
+    preview.empty()
+    return films_data, diary_entries
 
 st.markdown(f"<div id='home' style='font-size: 4.5em; font-weight: bold;'><span style='color: {ORANGE};'>Boxd</span>·<span style='color: {GREEN};'>Office</span></div>", unsafe_allow_html=True)
 st.write("Visualize your Letterboxd film data!")
@@ -53,6 +80,7 @@ st.write("Visualize your Letterboxd film data!")
 if 'films_df' not in st.session_state:
     with st.form("user_input"):
         username = st.text_input("Enter your Letterboxd username:")
+        remember = st.checkbox("Remember my films on this server so next time only new activity is loaded")
         submit_button = st.form_submit_button("Start")
 
         if submit_button:
@@ -61,17 +89,23 @@ if 'films_df' not in st.session_state:
             else:
                 with st.spinner("Loading your films... Hang tight! This could take a few minutes if you've watched a lot of films."):
                     try:
-                        # scrape films data
-                        films_data = get_films(username)
+                        if remember:
+                            # only fetch what changed since this profile was last loaded
+                            films_data, diary_entries = sync_profile(username)
+                        else:
+                            get_profile_store().forget(username)
+                            films_data, diary_entries = load_profile(username)
+
                         films_df = process_film_data(films_data)
-                        
-                        # scrape diary data
-                        diary_entries = get_diary_entries(username)
                         diary_df = process_diary_data(diary_entries)
+                        film_entities = FilmEntities(films_df)
                         
                         # store in session state
                         st.session_state['films_df'] = films_df
                         st.session_state['diary_df'] = diary_df
+                        st.session_state['film_entities'] = film_entities
+                        st.session_state['filter_index'] = FilterIndex(films_df, diary_df, film_entities)
+                        st.session_state['dataset_key'] = dataset_fingerprint(films_df, diary_df)
                         st.session_state['username'] = username
                         st.success("Data loaded successfully!")
                     except Exception as e:
@@ -81,11 +115,11 @@ if 'films_df' not in st.session_state:
 if 'films_df' in st.session_state and 'diary_df' in st.session_state:
     films_df = st.session_state['films_df']
     diary_df = st.session_state['diary_df']
+    film_entities = st.session_state['film_entities']
+    filter_index = st.session_state['filter_index']
+    dataset_key = st.session_state['dataset_key']
     username = st.session_state['username']
 
-    films_df['decade'] = (films_df['year'] // 10) * 10
-    diary_df['decade'] = (diary_df['year'] // 10) * 10
-
     # render sidebar only after data is loaded
     with st.sidebar:
         st.markdown(f"""
@@ -99,32 +133,6 @@ if 'films_df' in st.session_state and 'diary_df' in st.session_state:
                 flex-direction: column;
             }}
 
-            .sidebar-toc-wrapper {{
-                padding: 1rem;
-            }}
-
-            .sidebar-label {{
-                color: white;
-                font-style: italic;
-                margin-bottom: 0.25rem;
-                font-size: 14px;
-            }}
-
-            .sidebar-toc a {{
-                display: block;
-                font-size: 15px;
-                color: white;
-                padding: 4px 0;
-                text-decoration: none;
-            }}
-            
-            .sidebar-toc a:hover {{
-                text-decoration: underline;
-                text-decoration-color: {GREEN};
-                text-decoration-thickness: 0.1px;
-                text-underline-offset: 3px;
-            }}
-
             [data-testid="stSidebar"] .block-container {{
                 overflow: hidden !important;
             }}
@@ -133,125 +141,146 @@ if 'films_df' in st.session_state and 'diary_df' in st.session_state:
                 scroll-margin-top: 70px;
             }}
             </style>
-
-            <div class="sidebar-toc-wrapper">
-                <div class="sidebar-label" style="color: {GREEN};">Go to:</div>
-                <div class="sidebar-toc">
-                    <a href="#likes-ratings">Likes & Ratings</a>
-                    <a href="#diary">Diary</a>
-                    <a href="#genres-themes">Genres & Themes</a>
-                    <a href="#decades">Decades</a>
-                    <a href="#obscurity">Obscurity</a>
-                    <a href="#runtime">Runtime</a>
-                    <a href="#actors">Actors</a>
-                    <a href="#directors">Directors</a>
-                    <a href="#studios">Studios</a>
-                    <a href="#languages-countries">Languages & Countries</a>
-                    <a href="#home" style='color: {GREEN}; font-style: italic'>Back to top</a>
-                </div>
-            </div>
         """, unsafe_allow_html=True)
+        # only the chosen section's figures are computed on a rerun
+        selected_section = st.radio("Go to:", SECTIONS + [ALL_SECTIONS])
 
-    csv = films_df.to_csv(index=False).encode('utf-8')
+    csv = decode_film_data(films_df).to_csv(index=False).encode('utf-8')
     st.download_button("Download Data as CSV", data=csv, file_name=f'{username}_letterboxd_data.csv', mime='text/csv')
     
-    all_decades = sorted(films_df['decade'].dropna().unique())
-    decades_labels = [f"{int(d)}s" for d in all_decades]
+    decades_labels = [f"{d}s" for d in filter_index.decades]
     selected_decades = st.multiselect("Filter by decade:", decades_labels)
 
-    all_genres = sorted({g for genres in films_df['genres'] for g in genres})
-    selected_genres = st.multiselect("Filter by genre:", all_genres)
+    selected_genres = st.multiselect("Filter by genre:", filter_index.genres)
     
     st.write("These filters would be applied to every section. You can change this anytime.")
     
-    if selected_decades:
-        selected_decade_values = [int(d[:-1]) for d in selected_decades]
-        films_df = films_df[films_df['decade'].isin(selected_decade_values)]
-        diary_df = diary_df[diary_df['decade'].isin(selected_decade_values)]
+    selected_decade_values = [int(d[:-1]) for d in selected_decades]
+    if selected_decades or selected_genres:
+        films_df = films_df[filter_index.films_mask(selected_decade_values, selected_genres)]
+        diary_df = diary_df[filter_index.diary_mask(selected_decade_values)]
+
+    # charts come out the same for the same data and filters, whichever order they were picked in
+    figure_cache = get_figure_cache()
+    figure_pool = get_figure_pool()
+    filters = (tuple(sorted(selected_decade_values)), tuple(sorted(selected_genres)))
+    # the diary is only narrowed by decade, so its charts are shared across genre picks
+    diary_filters = (filters[0], ())
+    pending_charts = []
 
-    if selected_genres:
-        films_df = films_df[films_df['genres'].apply(lambda genres: any(g in genres for g in selected_genres))]
+    def chart(plot, *data, filters=filters, **params):
+        # holds the chart's place on the page while its figure is built on the pool; the
+        # figures are drawn in order once every chart on the page has been started
+        key = figure_key(dataset_key, filters, plot, params)
+        figure = figure_pool.submit(figure_cache.get, key, lambda: plot(*data, **params))
+        pending_charts.append((plot.__name__, st.empty(), figure))
+
+    def show(section):
+        return selected_section in (section, ALL_SECTIONS)
 
     st.divider()
 
     # likes & ratings
-    st.markdown(f"<a name='likes-ratings'></a><h2 style='color: {GREEN};'>Likes & Ratings</h2>", unsafe_allow_html=True)
-    col1, col2 = st.columns(2)
-    with col1:
-        st.plotly_chart(plot_ratings_histogram(films_df, selected_genres), use_container_width=True)
-    with col2:
-        st.plotly_chart(plot_liked_pie(films_df), use_container_width=True)
-    st.plotly_chart(plot_ratings_scatter(films_df, selected_genres), use_container_width=True)
-
-    st.markdown(f"<h3 style='font-weight: bold;'>Outliers</h3>", unsafe_allow_html=True)
-    outliers_df = films_df.dropna(subset=['rating', 'avg_rating']).copy()
-    if not outliers_df.empty:
-        outliers_df['diff'] = (outliers_df['rating'] - outliers_df['avg_rating']).abs()
-        top_outliers = outliers_df.sort_values(by='diff', ascending=False).head(5)
-        for _, row in top_outliers.iterrows():
-            direction = "higher" if row['rating'] > row['avg_rating'] else "lower"
-            diff = round(abs(row['rating'] - row['avg_rating']), 2)
-            st.markdown(f"""
-                You rated <span style='font-style: italic;'>{row['title']} ({int(row['year'])})</span> 
-                <span style='font-weight: bold; color: {BLUE};'>{diff} {direction}</span> than the average Letterboxd user.
-            """, unsafe_allow_html=True)
-    else:
-        st.write("No outliers found for the selected genre(s).")
-    st.divider()
+    if show("Likes & Ratings"):
+        st.markdown(f"<a name='likes-ratings'></a><h2 style='color: {GREEN};'>Likes & Ratings</h2>", unsafe_allow_html=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            chart(plot_ratings_histogram, films_df, selected_genres=selected_genres)
+        with col2:
+            chart(plot_liked_pie, films_df)
+        chart(plot_ratings_scatter, films_df, selected_genres=selected_genres)
+
+        st.markdown(f"<h3 style='font-weight: bold;'>Outliers</h3>", unsafe_allow_html=True)
+        outliers_df = films_df.dropna(subset=['rating', 'avg_rating']).copy()
+        if not outliers_df.empty:
+            outliers_df['diff'] = (outliers_df['rating'] - outliers_df['avg_rating']).abs()
+            top_outliers = outliers_df.sort_values(by='diff', ascending=False).head(5)
+            for _, row in top_outliers.iterrows():
+                direction = "higher" if row['rating'] > row['avg_rating'] else "lower"
+                diff = round(abs(row['rating'] - row['avg_rating']), 2)
+                st.markdown(f"""
+                    You rated <span style='font-style: italic;'>{row['title']} ({int(row['year'])})</span> 
+                    <span style='font-weight: bold; color: {BLUE};'>{diff} {direction}</span> than the average Letterboxd user.
+                """, unsafe_allow_html=True)
+        else:
+            st.write("No outliers found for the selected genre(s).")
+        st.divider()
 
     # diary
-    st.markdown(f"<a name='diary'></a><h2 style='color: {GREEN};'>Diary</h2>", unsafe_allow_html=True)
-    st.markdown(f"<h3 style='font-weight: bold;'>Your Activity</h3>", unsafe_allow_html=True)
-    st.plotly_chart(plot_diary_chart(diary_df), use_container_width=True)
-    st.plotly_chart(plot_rating_timeline(diary_df), use_container_width=True)
-    st.divider()
+    if show("Diary"):
+        st.markdown(f"<a name='diary'></a><h2 style='color: {GREEN};'>Diary</h2>", unsafe_allow_html=True)
+        st.markdown(f"<h3 style='font-weight: bold;'>Your Activity</h3>", unsafe_allow_html=True)
+        chart(plot_diary_chart, diary_df, filters=diary_filters)
+        chart(plot_rating_timeline, diary_df, filters=diary_filters)
+        st.divider()
 
     # genres & themes
-    st.markdown(f"<a name='genres-themes'></a><h2 style='color: {GREEN};'>Genres & Themes</h2>", unsafe_allow_html=True)
-    st.plotly_chart(plot_popular_genres(films_df), use_container_width=True)
-    st.plotly_chart(plot_genre_rating_radar(films_df), use_container_width=True)
-    st.plotly_chart(plot_popular_themes(films_df), use_container_width=True)
-    st.divider()
+    if show("Genres & Themes"):
+        st.markdown(f"<a name='genres-themes'></a><h2 style='color: {GREEN};'>Genres & Themes</h2>", unsafe_allow_html=True)
+        chart(plot_popular_genres, films_df, film_entities)
+        chart(plot_genre_rating_radar, films_df, film_entities)
+        chart(plot_popular_themes, films_df, film_entities)
+        st.divider()
 
     # decades
-    st.markdown(f"<a name='decades'></a><h2 style='color: {GREEN};'>Decades</h2>", unsafe_allow_html=True)
-    st.plotly_chart(plot_popular_decades(films_df), use_container_width=True)
-    st.plotly_chart(plot_decades_rating_radar(films_df), use_container_width=True)
-    st.plotly_chart(plot_yearly_average_ratings(films_df), use_container_width=True)
-    st.divider()
+    if show("Decades"):
+        st.markdown(f"<a name='decades'></a><h2 style='color: {GREEN};'>Decades</h2>", unsafe_allow_html=True)
+        chart(plot_popular_decades, films_df)
+        chart(plot_decades_rating_radar, films_df)
+        chart(plot_yearly_average_ratings, films_df)
+        st.divider()
 
     # obscurity
-    st.markdown(f"<a name='obscurity'></a><h2 style='color: {GREEN};'>Obscurity</h2>", unsafe_allow_html=True)
-    st.plotly_chart(plot_members_histogram(films_df), use_container_width=True)
-    st.plotly_chart(plot_avg_rating_distribution(films_df), use_container_width=True)
-    st.plotly_chart(plot_liked_histogram(films_df), use_container_width=True)
-    st.plotly_chart(plot_percent_liked_histogram(films_df), use_container_width=True)
-    
-    st.divider()
+    if show("Obscurity"):
+        st.markdown(f"<a name='obscurity'></a><h2 style='color: {GREEN};'>Obscurity</h2>", unsafe_allow_html=True)
+        chart(plot_members_histogram, films_df)
+        chart(plot_avg_rating_distribution, films_df)
+        chart(plot_liked_histogram, films_df)
+        chart(plot_percent_liked_histogram, films_df)
+        st.divider()
 
     # runtime
-    st.markdown(f"<a name='runtime'></a><h2 style='color: {GREEN};'>Runtime</h2>", unsafe_allow_html=True)
-    st.plotly_chart(plot_runtime_histogram(films_df), use_container_width=True)
-    st.divider()
+    if show("Runtime"):
+        st.markdown(f"<a name='runtime'></a><h2 style='color: {GREEN};'>Runtime</h2>", unsafe_allow_html=True)
+        chart(plot_runtime_histogram, films_df)
+        st.divider()
 
     # actors
-    st.markdown(f"<a name='actors'></a><h2 style='color: {GREEN};'>Actors</h2>", unsafe_allow_html=True)
-    st.plotly_chart(plot_popular_actors(films_df), use_container_width=True)
-    st.divider()
-    
+    if show("Actors"):
+        st.markdown(f"<a name='actors'></a><h2 style='color: {GREEN};'>Actors</h2>", unsafe_allow_html=True)
+        chart(plot_popular_actors, films_df, film_entities)
+        st.divider()
+
     # directors
-    st.markdown(f"<a name='directors'></a><h2 style='color: {GREEN};'>Directors</h2>", unsafe_allow_html=True)
-    st.plotly_chart(plot_popular_directors(films_df), use_container_width=True)
-    st.plotly_chart(plot_director_rating_radar(films_df), use_container_width=True)
-    st.divider()
+    if show("Directors"):
+        st.markdown(f"<a name='directors'></a><h2 style='color: {GREEN};'>Directors</h2>", unsafe_allow_html=True)
+        chart(plot_popular_directors, films_df, film_entities)
+        chart(plot_director_rating_radar, films_df, film_entities)
+        st.divider()
 
     # studios
-    st.markdown(f"<a name='studios'></a><h2 style='color: {GREEN};'>Studios</h2>", unsafe_allow_html=True)
-    st.plotly_chart(plot_popular_studios(films_df), use_container_width=True)
-    st.plotly_chart(plot_studio_rating_radar(films_df), use_container_width=True)
-    st.divider()
+    if show("Studios"):
+        st.markdown(f"<a name='studios'></a><h2 style='color: {GREEN};'>Studios</h2>", unsafe_allow_html=True)
+        chart(plot_popular_studios, films_df, film_entities)
+        chart(plot_studio_rating_radar, films_df, film_entities)
+        st.divider()
 
     # languages & countries
-    st.markdown(f"<a name='languages-countries'></a><h2 style='color: {GREEN};'>Languages & Countries</h2>", unsafe_allow_html=True)
-    st.plotly_chart(plot_popular_languages(films_df), use_container_width=True)
-    st.plotly_chart(plot_popular_countries_map(films_df), use_container_width=True)
\ No newline at end of file
+    if show("Languages & Countries"):
+        st.markdown(f"<a name='languages-countries'></a><h2 style='color: {GREEN};'>Languages & Countries</h2>", unsafe_allow_html=True)
+        chart(plot_popular_languages, films_df)
+        chart(plot_popular_countries_map, films_df, film_entities)
+        st.divider()
+
+    chart_payloads = []
+    for name, slot, figure in pending_charts:
+        fig, spec, seconds = figure.result()
+        draw_figure(slot, fig, spec)
+        chart_payloads.append({'chart': name, 'KB': round(len(spec) / 1024, 1), 'serialize ms': round(seconds * 1000, 2)})
+
+    cache_stats = figure_cache.stats()
+    st.caption(f"Figure cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['figures']} figures ({cache_stats['bytes'] / 1024 / 1024:.1f} MB)")
+    with st.expander("Chart payloads"):
+        # serialize ms is the time spent writing the chart's json when it was first built;
+        # cached charts aren't serialized again
+        st.dataframe(chart_payloads, hide_index=True, use_container_width=True)
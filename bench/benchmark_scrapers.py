@@ -0,0 +1,94 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+# times the scrapers against a local fake_letterboxd.py server, so throughput numbers are
+# reproducible. run from the repo root: python -m bench.benchmark_scrapers --films 1000
+
+def wait_for_server(url, server=None, timeout=10):
+    # with server (the fake_letterboxd process we started), fail loudly if it exits, e.g.
+    # because the port is taken, or if the port is answered by some other server
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server and server.poll() is not None:
+            raise RuntimeError(f"fake server exited with status {server.returncode}, is its port already in use?")
+        try:
+            stats = json.loads(urllib.request.urlopen(url).read())
+        except OSError:
+            time.sleep(0.1)
+            continue
+        if server and stats.get('pid') != server.pid:
+            raise RuntimeError(f"another server is already running at {url}, pick a free --port")
+        return stats
+    raise RuntimeError(f"fake server didn't start at {url}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against a local stand-in server")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--username', default='benchmark')
+    parser.add_argument('--corpus', help="serve a corpus recorded with record_corpus.py instead of a synthetic library")
+    parser.add_argument('--films', type=int, default=1000)
+    parser.add_argument('--diary', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--rate', type=float, default=1000, help="requests per second allowed by the rate limiter")
+    parser.add_argument('--stages', default='films,films_cached,diary,profile')
+    args = parser.parse_args()
+
+    server_args = [
+        '--port', str(args.port), '--films', str(args.films), '--diary', str(args.diary),
+        '--latency', str(args.latency), '--jitter', str(args.jitter),
+        '--error-rate', str(args.error_rate), '--throttle-rate', str(args.throttle_rate)
+    ]
+    if args.corpus:
+        server_args += ['--corpus', args.corpus]
+    server = subprocess.Popen([sys.executable, '-m', 'bench.fake_letterboxd'] + server_args)
+
+    # the scrapers read these on import, and the cache and limiter state stay out of the real ones
+    base_url = f"http://localhost:{args.port}"
+    os.environ['LETTERBOXD_BASE_URL'] = base_url
+    os.environ['BOXD_CACHE_DIR'] = tempfile.mkdtemp(prefix='boxd-bench-')
+    os.environ['BOXD_RATE_LIMIT'] = str(args.rate)
+    os.environ['BOXD_RATE_BURST'] = str(args.rate)
+
+    from scrapers import scrape_films
+    from scrapers.scrape_diary import get_diary_entries
+    from scrapers.scrape_profile import iter_profile
+    scrape_films.DEBUG = False
+
+    stages = {
+        # the cache directory starts empty, so the first films run fills it and the second reads it
+        'films': lambda: scrape_films.get_films(args.username),
+        'films_cached': lambda: scrape_films.get_films(args.username),
+        'diary': lambda: get_diary_entries(args.username),
+        # what the app runs: film batches and the diary on one engine
+        'profile': lambda: [data for kind, data in iter_profile(args.username, use_cache=False) if kind != 'warning'],
+    }
+
+    try:
+        counters = wait_for_server(f"{base_url}/_stats", server)
+        print(f"{'stage':<14}{'seconds':>10}{'requests':>10}{'req/s':>10}{'records':>10}")
+        for name in args.stages.split(','):
+            before = counters['requests']
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = stages[name]()
+            elapsed = time.perf_counter() - start
+            counters = wait_for_server(f"{base_url}/_stats")
+            requests = counters['requests'] - before
+            records = sum(len(part) for part in result) if name == 'profile' else len(result)
+            print(f"{name:<14}{elapsed:>10.2f}{requests:>10}{requests / elapsed:>10.1f}{records:>10}")
+    finally:
+        server.terminate()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import plotly.io
+
+from bench.benchmark_scrapers import wait_for_server
+
+# builds every dashboard chart from a fake_letterboxd.py library and reports numeric arrays
+# that plotly serialized as plain json lists instead of its binary typed-array encoding,
+# which happens when a chart passes python lists or object arrays rather than numpy arrays.
+# run from the repo root: python -m bench.check_figures --films 2000
+
+CHARTS = [
+    'visualizations.ratings.ratings_histogram.plot_ratings_histogram',
+    'visualizations.ratings.liked_pie.plot_liked_pie',
+    'visualizations.ratings.ratings_scatter.plot_ratings_scatter',
+    'visualizations.diary.diary_chart.plot_diary_chart',
+    'visualizations.diary.ratings_line.plot_rating_timeline',
+    'visualizations.genres.popular_genres.plot_popular_genres',
+    'visualizations.genres.genre_radar.plot_genre_rating_radar',
+    'visualizations.genres.popular_themes.plot_popular_themes',
+    'visualizations.genres.theme_radar.plot_theme_rating_radar',
+    'visualizations.decades.popular_decades.plot_popular_decades',
+    'visualizations.decades.decade_radar.plot_decades_rating_radar',
+    'visualizations.decades.year_ratings.plot_yearly_average_ratings',
+    'visualizations.obscurity.members_histogram.plot_members_histogram',
+    'visualizations.obscurity.ratings_histogram.plot_avg_rating_distribution',
+    'visualizations.obscurity.liked_histogram.plot_liked_histogram',
+    'visualizations.obscurity.percent_liked_histogram.plot_percent_liked_histogram',
+    'visualizations.runtime.runtime_histogram.plot_runtime_histogram',
+    'visualizations.runtime.runtime_scatter.plot_runtime_scatter',
+    'visualizations.actors.popular_actors.plot_popular_actors',
+    'visualizations.directors.popular_directors.plot_popular_directors',
+    'visualizations.directors.director_radar.plot_director_rating_radar',
+    'visualizations.studios.popular_studios.plot_popular_studios',
+    'visualizations.studios.studio_radar.plot_studio_rating_radar',
+    'visualizations.languages.popular_languages.plot_popular_languages',
+    'visualizations.languages.countries_map.plot_popular_countries_map',
+]
+
+def load_chart(path):
+    module, name = path.rsplit('.', 1)
+    return getattr(__import__(module, fromlist=[name]), name)
+
+def build(plot, films_df, diary_df, film_entities):
+    params = inspect.signature(plot).parameters
+    if 'diary_df' in params:
+        return plot(diary_df)
+    if 'film_entities' in params:
+        return plot(films_df, film_entities)
+    return plot(films_df)
+
+def is_numeric(value):
+    if isinstance(value, list):
+        return all(is_numeric(v) for v in value)
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+def list_encoded(node, path, min_length):
+    # (path, length) of every numeric list in node with at least min_length values
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from list_encoded(value, f"{path}.{key}", min_length)
+    elif isinstance(node, list) and node:
+        if is_numeric(node):
+            if len(node) >= min_length:
+                yield path, len(node)
+        else:
+            for i, value in enumerate(node):
+                if isinstance(value, dict):
+                    yield from list_encoded(value, f"{path}[{i}]", min_length)
+
+def main():
+    parser = argparse.ArgumentParser(description="Report charts whose numeric trace data isn't binary encoded")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--username', default='benchmark')
+    parser.add_argument('--corpus', help="serve a corpus recorded with record_corpus.py instead of a synthetic library")
+    parser.add_argument('--films', type=int, default=2000)
+    parser.add_argument('--diary', type=int, default=1000)
+    parser.add_argument('--min-length', type=int, default=2, help="ignore lists shorter than this")
+    args = parser.parse_args()
+
+    server_args = ['--port', str(args.port), '--films', str(args.films), '--diary', str(args.diary), '--latency', '0', '--jitter', '0']
+    if args.corpus:
+        server_args += ['--corpus', args.corpus]
+    server = subprocess.Popen([sys.executable, '-m', 'bench.fake_letterboxd'] + server_args)
+
+    base_url = f"http://localhost:{args.port}"
+    os.environ['LETTERBOXD_BASE_URL'] = base_url
+    os.environ['BOXD_CACHE_DIR'] = tempfile.mkdtemp(prefix='boxd-bench-')
+    os.environ['BOXD_RATE_LIMIT'] = '1000'
+    os.environ['BOXD_RATE_BURST'] = '1000'
+
+    from scrapers import scrape_films
+    from scrapers.scrape_diary import get_diary_entries
+    from dataset.schema import process_film_data, process_diary_data
+    from dataset.entities import FilmEntities
+    scrape_films.DEBUG = False
+
+    try:
+        wait_for_server(f"{base_url}/_stats", server)
+        with contextlib.redirect_stdout(io.StringIO()):
+            films_df = process_film_data(scrape_films.get_films(args.username))
+            diary_df = process_diary_data(get_diary_entries(args.username))
+    finally:
+        server.terminate()
+    film_entities = FilmEntities(films_df)
+
+    failures = 0
+    for path in CHARTS:
+        plot = load_chart(path)
+        fig = json.loads(plotly.io.to_json(build(plot, films_df, diary_df, film_entities), validate=False))
+        found = list(list_encoded(fig['data'], 'data', args.min_length))
+        failures += bool(found)
+        print(f"{'LIST' if found else 'ok':<6}{plot.__name__}")
+        for where, length in found:
+            print(f"        {where}: {length} values")
+
+    print(f"{failures} of {len(CHARTS)} charts list-encode numeric arrays of {args.min_length}+ values")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
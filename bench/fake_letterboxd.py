@@ -0,0 +1,231 @@
+import argparse
+import asyncio
+import html
+import os
+import random
+import re
+from datetime import date, timedelta
+from aiohttp import web
+
+# a local stand-in for the parts of letterboxd.com the scrapers read, serving either a
+# synthetic library of any size or a corpus recorded with record_corpus.py. run it with
+# python -m bench.fake_letterboxd, then point the scrapers at it with
+# LETTERBOXD_BASE_URL=http://localhost:8765
+
+FILMS_PER_PAGE = 72
+DIARY_PER_PAGE = 50
+GENRES = ['Drama', 'Comedy', 'Horror', 'Thriller', 'Romance', 'Animation', 'Documentary', 'Science Fiction']
+COUNTRIES = ['USA', 'UK', 'France', 'Japan', 'South Korea', 'Germany']
+LANGUAGES = ['English', 'French', 'Japanese', 'Korean', 'German']
+STARS = {2: '★', 4: '★★', 6: '★★★', 8: '★★★★', 10: '★★★★★', 1: '½', 3: '★½', 5: '★★½', 7: '★★★½', 9: '★★★★½'}
+
+FILMS_PATH = re.compile(r'^/[^/]+/films/(?:page/(\d+)/)?$')
+DIARY_PATH = re.compile(r'^/[^/]+/films/diary/page/(\d+)/$')
+FILM_PATH = re.compile(r'^/film/([^/]+)/$')
+STATS_PATH = re.compile(r'^/csi/film/([^/]+)/stats/$')
+RATINGS_PATH = re.compile(r'^/csi/film/([^/]+)/ratings-summary/$')
+
+def e(text):
+    return html.escape(str(text))
+
+def format_stat(num):
+    # same abbreviations as the stats tooltips on the site
+    if num >= 1_000_000:
+        return f"{num / 1_000_000:.1f}M"
+    if num >= 1_000:
+        return f"{num / 1_000:.0f}K"
+    return str(num)
+
+class SyntheticSite:
+    # every user gets the same generated library, so any username works
+    def __init__(self, num_films, num_diary, label_page_start=True, seed=0):
+        rng = random.Random(seed)
+        self.label_page_start = label_page_start
+        self.films = []
+        for i in range(num_films):
+            watched = rng.randint(100, 3_000_000)
+            self.films.append({
+                'slug': f'film-{i}',
+                'name': f'Film {i}',
+                'year': rng.randint(1920, 2025),
+                'rating': rng.choice([0, 0] + list(range(1, 11))),
+                'liked': rng.random() < 0.3,
+                'runtime': rng.randint(70, 200),
+                'genres': rng.sample(GENRES, rng.randint(1, 3)),
+                'themes': [f'Theme {rng.randint(0, 40)}'],
+                'directors': [f'Director {rng.randint(0, 300)}'],
+                'cast': [f'Actor {rng.randint(0, 2000)}' for _ in range(rng.randint(3, 15))],
+                'studios': [f'Studio {rng.randint(0, 100)}'],
+                'countries': rng.sample(COUNTRIES, 1),
+                'language': rng.choice(LANGUAGES),
+                'watched': watched,
+                'liked_by': int(watched * rng.uniform(0.05, 0.4)),
+                'avg': round(rng.uniform(1.5, 4.5), 2),
+            })
+        self.by_slug = {film['slug']: film for film in self.films}
+
+        # diary entries go back in time from the newest, a few days apart
+        day = date(2025, 6, 30)
+        self.diary = []
+        for _ in range(num_diary):
+            day -= timedelta(days=rng.randint(0, 3))
+            self.diary.append((day, rng.choice(self.films)))
+
+    def render(self, path):
+        match = FILMS_PATH.match(path)
+        if match:
+            return self.films_page(int(match.group(1) or 1))
+        match = DIARY_PATH.match(path)
+        if match:
+            return self.diary_page(int(match.group(1)))
+        for pattern, render in [(FILM_PATH, self.film_page), (STATS_PATH, self.stats), (RATINGS_PATH, self.ratings_summary)]:
+            match = pattern.match(path)
+            if match and match.group(1) in self.by_slug:
+                return render(self.by_slug[match.group(1)])
+        return None
+
+    def films_page(self, page):
+        films = self.films[(page - 1) * FILMS_PER_PAGE:page * FILMS_PER_PAGE]
+        total_pages = max(1, -(-len(self.films) // FILMS_PER_PAGE))
+        items = []
+        for film in films:
+            viewing = ''
+            if film['rating']:
+                viewing += f"<span class='rating rated-{film['rating']}'>{STARS[film['rating']]}</span>"
+            if film['liked']:
+                viewing += "<span class='like liked-micro has-icon icon-liked icon-16'></span>"
+            items.append(
+                f"<li class='griditem'><div class='react-component' data-item-slug='{e(film['slug'])}' "
+                f"data-item-name='{e(film['name'])}'></div>"
+                f"<p class='poster-viewingdata'>{viewing}</p></li>"
+            )
+        # like the site, pagination links the first few and last pages
+        shown = sorted(p for p in {1, 2, 3, total_pages - 1, total_pages} if 1 <= p <= total_pages)
+        links = ''.join(f"<li><a href='#'>{p}</a></li>" for p in shown)
+        older = "<a class='next' href='#'>Older</a>" if page < total_pages else ''
+        return (
+            f"<html><body><span class='js-former-count'>{len(self.films):,}</span>"
+            f"<ul class='grid'>{''.join(items)}</ul>"
+            f"<div class='pagination'><div class='paginate-pages'><ul>{links}</ul></div>{older}</div></body></html>"
+        )
+
+    def film_page(self, film):
+        def links(prefix, names):
+            return ''.join(f"<a href='/{prefix}/{e(name.lower().replace(' ', '-'))}/'>{e(name)}</a>" for name in names)
+        return (
+            f"<html><head><meta property='og:title' content='{e(film['name'])} ({film['year']})'></head><body>"
+            f"<section class='production-masthead'><div class='releaseyear'><a href='#'>{film['year']}</a></div></section>"
+            f"<p class='text-link text-footer'>{film['runtime']}&nbsp;mins &nbsp; More at IMDb TMDB</p>"
+            f"<div id='tab-cast'>{links('actor', film['cast'])}</div>"
+            f"<div id='tab-crew'><h3>Director</h3><div>{links('director', film['directors'])}</div></div>"
+            f"<div id='tab-details'><h3>Studios</h3><div>{links('studio', film['studios'])}</div>"
+            f"<h3>Country</h3><div>{links('films/country', film['countries'])}</div>"
+            f"<h3>Primary Language</h3><div>{links('films/language', [film['language']])}</div></div>"
+            f"<div id='tab-genres'><h3>Genres</h3><div>{links('films/genre', film['genres'])}</div>"
+            f"<h3>Themes</h3><div>{links('films/theme', film['themes'])}</div></div>"
+            # real film pages are mostly markup the scrapers skip
+            f"<div class='filler'>{'<p>lorem ipsum dolor sit amet</p>' * 200}</div>"
+            "</body></html>"
+        )
+
+    def stats(self, film):
+        return (
+            f"<ul>\n<li class='filmstat-watches'><a>{format_stat(film['watched'])}</a></li>\n"
+            f"<li class='filmstat-lists'><a>{format_stat(film['watched'] // 50)}</a></li>\n"
+            f"<li class='filmstat-likes'><a>{format_stat(film['liked_by'])}</a></li>\n</ul>"
+        )
+
+    def ratings_summary(self, film):
+        return f"<section><span class='average-rating'><a>{film['avg']:.2f} ★</a></span></section>"
+
+    def diary_page(self, page):
+        entries = self.diary[(page - 1) * DIARY_PER_PAGE:page * DIARY_PER_PAGE]
+        total_pages = max(1, -(-len(self.diary) // DIARY_PER_PAGE))
+        previous = self.diary[(page - 1) * DIARY_PER_PAGE - 1][0] if 1 < page <= total_pages else None
+        rows = []
+        for i, (day, film) in enumerate(entries):
+            # month and year only show on the first entry of each month (and, on the site,
+            # the first entry of each page unless label_page_start is off)
+            new_month = previous is None or (day.year, day.month) != (previous.year, previous.month)
+            if i == 0 and self.label_page_start:
+                new_month = True
+            month = f"<a class='month' href='#'>{day.strftime('%b')}</a><a class='year' href='#'>{day.year}</a>" if new_month else ''
+            rows.append(
+                f"<tr class='diary-entry-row'><td class='col-monthdate'>{month}</td>"
+                f"<td class='col-daydate'><a class='daydate' href='#'>{day.day:02d}</a></td>"
+                f"<td class='col-production'><div class='react-component' data-item-slug='{e(film['slug'])}'></div>"
+                f"<h2 class='name'><a href='/film/{e(film['slug'])}/'>{e(film['name'])}</a></h2></td>"
+                f"<td class='col-releaseyear'><span>{film['year']}</span></td>"
+                f"<td class='col-rating'><input class='rateit-field' value='{film['rating']}'></td></tr>"
+            )
+            previous = day
+        links = ''.join(f"<li><a href='#'>{p}</a></li>" for p in sorted({1, total_pages}))
+        return (
+            f"<html><body><table><tbody>{''.join(rows)}</tbody></table>"
+            f"<div class='paginate-pages'><ul>{links}</ul></div></body></html>"
+        )
+
+class RecordedSite:
+    # pages saved by record_corpus.py, stored as <corpus>/<url path>/index.html
+    def __init__(self, corpus):
+        self.corpus = corpus
+
+    def render(self, path):
+        file_path = os.path.join(self.corpus, path.strip('/'), 'index.html')
+        if '..' in path or not os.path.isfile(file_path):
+            return None
+        with open(file_path, encoding='utf-8') as f:
+            return f.read()
+
+def make_app(site, latency=0.05, jitter=0.02, error_rate=0.0, throttle_rate=0.0, seed=0):
+    # latency +/- jitter seconds per response; throttle_rate and error_rate are the
+    # fractions of responses replaced by a 429 or a 503
+    rng = random.Random(seed)
+    counters = {'requests': 0, 'errors': 0, 'throttled': 0}
+
+    async def handle(request):
+        counters['requests'] += 1
+        await asyncio.sleep(max(0.0, latency + rng.uniform(-jitter, jitter)))
+
+        roll = rng.random()
+        if roll < throttle_rate:
+            counters['throttled'] += 1
+            return web.Response(status=429, text='Too Many Requests')
+        if roll < throttle_rate + error_rate:
+            counters['errors'] += 1
+            return web.Response(status=503, text='Service Unavailable')
+
+        page = site.render(request.path)
+        if page is None:
+            return web.Response(status=404, text='Not Found')
+        return web.Response(text=page, content_type='text/html')
+
+    async def stats(request):
+        # the pid lets the benchmarks check they reached the server they started
+        return web.json_response({**counters, 'pid': os.getpid()})
+
+    app = web.Application()
+    app.router.add_get('/_stats', stats)
+    app.router.add_get('/{path:.*}', handle)
+    return app
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for letterboxd.com")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--corpus', help="serve pages recorded with record_corpus.py from this directory")
+    parser.add_argument('--films', type=int, default=1000, help="synthetic library size")
+    parser.add_argument('--diary', type=int, default=500, help="synthetic diary entries")
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--no-page-labels', action='store_true', help="don't repeat the month/year at the top of each diary page")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.corpus:
+        site = RecordedSite(args.corpus)
+    else:
+        site = SyntheticSite(args.films, args.diary, not args.no_page_labels, args.seed)
+    app = make_app(site, args.latency, args.jitter, args.error_rate, args.throttle_rate, args.seed)
+    web.run_app(app, port=args.port, print=None)
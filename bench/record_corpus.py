@@ -0,0 +1,51 @@
+import argparse
+import os
+from scrapers.engine import BASE_URL
+from scrapers.scrape_films import make_request, parse_films_page, parse_total_pages
+
+# saves the pages a scrape of one profile reads, so fake_letterboxd.py --corpus can serve
+# them back. run from the repo root: python -m bench.record_corpus <username> <corpus dir>
+# requests go through the scrapers' rate limiter
+
+def save(corpus, path, text):
+    directory = os.path.join(corpus, path.strip('/'))
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def record(path, corpus):
+    text = make_request(BASE_URL + path).text
+    save(corpus, path, text)
+    return text
+
+def record_profile(username, corpus, max_films=None):
+    first_page = record(f"/{username}/films/", corpus)
+    films, _ = parse_films_page(first_page)
+    for page in range(2, parse_total_pages(first_page) + 1):
+        page_films, _ = parse_films_page(record(f"/{username}/films/page/{page}/", corpus))
+        films.extend(page_films)
+    print(f"Recorded {len(films)} films from the film list")
+
+    first_diary = record(f"/{username}/films/diary/page/1/", corpus)
+    diary_pages = parse_total_pages(first_diary)
+    for page in range(2, diary_pages + 1):
+        record(f"/{username}/films/diary/page/{page}/", corpus)
+    print(f"Recorded {diary_pages} diary pages")
+
+    slugs = list(dict.fromkeys(film['film_slug'] for film in films))[:max_films]
+    for i, slug in enumerate(slugs, 1):
+        for path in [f"/film/{slug}/", f"/csi/film/{slug}/stats/", f"/csi/film/{slug}/ratings-summary/"]:
+            try:
+                record(path, corpus)
+            except Exception as e:
+                print(f"Error recording {path}: {str(e)[:200]}")
+        if i % 25 == 0:
+            print(f"Recorded details for {i}/{len(slugs)} films")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record a profile's pages for fake_letterboxd.py")
+    parser.add_argument('username')
+    parser.add_argument('corpus')
+    parser.add_argument('--max-films', type=int, help="only record details for this many films")
+    args = parser.parse_args()
+    record_profile(args.username, args.corpus, args.max_films)
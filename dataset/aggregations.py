@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+def top_titles(rows, group, by, top_n=3, index=None):
+    # the titles of the top_n rows by rows[by] in each group of rows[group], highest
+    # first. reads the <by>_rank column from process_film_data, so it's one sort of
+    # the whole frame rather than a sort per group. groups in index with no ranked
+    # rows get an empty list
+    rank = f"{by}_rank"
+    ranked = rows[rows[rank] >= 0].sort_values(rank, kind='stable')
+    codes, groups = pd.factorize(ranked[group], sort=True)
+    # a stable sort on the group codes keeps each group's rows in rank order, so the
+    # groups are contiguous runs and the first top_n of each run are the ones we want
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    titles = ranked['title'].to_numpy(dtype=object)[order]
+    starts = np.flatnonzero(np.diff(codes, prepend=-2))
+    position = np.arange(len(codes)) - np.repeat(starts, np.diff(starts, append=len(codes)))
+    keep = (position < top_n) & (codes >= 0)
+    codes, titles = codes[keep], titles[keep]
+    lists = [chunk.tolist() for chunk in np.split(titles, np.flatnonzero(np.diff(codes)) + 1)] if len(codes) else []
+    groups = pd.Index(groups, name=group)
+    if index is None:
+        return pd.Series(lists, index=groups, name='title', dtype=object)
+    found = groups.get_indexer(index)
+    return pd.Series([lists[i] if i >= 0 else [] for i in found], index=index, name='title', dtype=object)
+
+def summarize_entities(rows, key, top_n=3):
+    # one row per value of rows[key], sorted by it, with the counts and example titles
+    # behind the "most watched" bar charts. rows needs liked, title, num_watched_rank
+    # and rating_rank columns, e.g. from FilmEntities.rows
+    rows = rows.dropna(subset=[key])
+    codes, names = pd.factorize(rows[key], sort=True)
+    names = np.asarray(names)
+    total = np.bincount(codes, minlength=len(names))
+    liked = np.bincount(codes, weights=rows['liked'].to_numpy(dtype=float), minlength=len(names)).astype(int)
+
+    summary = pd.DataFrame({key: names, 'total': total, 'liked': liked})
+    summary['unliked'] = total - liked
+    summary['liked_pct'] = np.round(100 * liked / np.maximum(total, 1)).astype(int)
+    # examples are the most watched films, favourites the highest rated
+    summary['examples'] = top_titles(rows, key, 'num_watched', top_n, names).to_numpy()
+    summary['favourites'] = top_titles(rows, key, 'rating', top_n, names).to_numpy()
+    return summary
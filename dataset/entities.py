@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+from dataset.schema import LIST_COLUMNS
+
+class FilmEntities:
+    # the list columns of a films frame as one long (film_idx, dimension, entity_id) table.
+    # it's built once per dataset and kept with it, so the charts pick out the films they
+    # need instead of exploding the whole wide frame on every rerun. film_idx is the film's
+    # index label in the frame it was built from, entity_id indexes names[dimension]
+    def __init__(self, films_df):
+        self.num_films = len(films_df)
+        self.names = {}
+        self.spans = {}
+        film_idx, entity_id = [], []
+        start = 0
+        for dimension in LIST_COLUMNS:
+            lists = films_df[dimension].array.__arrow_array__()
+            parents = pc.list_parent_indices(lists).to_numpy()
+            items = pc.list_flatten(lists).unify_dictionaries()
+            if items.num_chunks:
+                self.names[dimension] = items.chunk(0).dictionary.to_numpy(zero_copy_only=False).astype(object)
+                ids = np.concatenate([chunk.indices.to_numpy() for chunk in items.chunks])
+            else:
+                self.names[dimension] = np.array([], dtype=object)
+                ids = np.array([], dtype=np.int32)
+
+            film_idx.append(films_df.index.to_numpy()[parents].astype(np.int32))
+            entity_id.append(ids.astype(np.int32))
+            self.spans[dimension] = (start, start + len(ids))
+            start += len(ids)
+
+        self.table = pd.DataFrame({
+            'film_idx': np.concatenate(film_idx),
+            'dimension': pd.Categorical.from_codes(
+                np.repeat(np.arange(len(LIST_COLUMNS), dtype=np.int8), [len(ids) for ids in entity_id]),
+                categories=LIST_COLUMNS
+            ),
+            'entity_id': np.concatenate(entity_id),
+        })
+
+    def rows(self, films_df, dimension, columns):
+        # one row per (film, entity) for the films still in films_df (e.g. after filtering),
+        # holding the given film columns plus the entity name under the dimension's name.
+        # same rows, order and index as films_df.explode(dimension).dropna(subset=[dimension])
+        start, stop = self.spans[dimension]
+        film_idx = self.table['film_idx'].to_numpy()[start:stop]
+        entity_id = self.table['entity_id'].to_numpy()[start:stop]
+
+        position = np.full(self.num_films, -1, dtype=np.int64)
+        position[films_df.index.to_numpy()] = np.arange(len(films_df))
+        positions = position[film_idx]
+        keep = positions >= 0
+
+        rows = films_df[columns].take(positions[keep])
+        rows[dimension] = self.names[dimension][entity_id[keep]]
+        return rows
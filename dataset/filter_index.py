@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+class FilterIndex:
+    # one row bitmap per decade and per genre, built once per dataset, so applying any
+    # combination of filters is a few ORs and an AND instead of a pass over every film's list
+    def __init__(self, films_df, diary_df, film_entities):
+        film_decades = (films_df['year'] // 10) * 10
+        self.decades = [int(d) for d in sorted(film_decades.dropna().unique())]
+        self.film_decades = bitmaps(decade_codes(film_decades, self.decades), len(self.decades))
+        self.diary_decades = bitmaps(decade_codes((diary_df['year'] // 10) * 10, self.decades), len(self.decades))
+
+        # genre ids index the genre names, which are sorted and all occur at least once
+        self.genres = film_entities.names['genres'].tolist()
+        start, stop = film_entities.spans['genres']
+        film_genres = np.zeros((len(self.genres), len(films_df)), dtype=bool)
+        film_genres[
+            film_entities.table['entity_id'].to_numpy()[start:stop],
+            films_df.index.get_indexer(film_entities.table['film_idx'].to_numpy()[start:stop])
+        ] = True
+        self.film_genres = film_genres
+
+    def films_mask(self, decades=(), genres=()):
+        # films in any of the decades and with any of the genres; an empty list doesn't filter
+        mask = np.ones(self.film_genres.shape[1], dtype=bool)
+        if decades:
+            mask &= self.film_decades[[self.decades.index(d) for d in decades]].any(axis=0)
+        if genres:
+            mask &= self.film_genres[[self.genres.index(g) for g in genres]].any(axis=0)
+        return mask
+
+    def diary_mask(self, decades=()):
+        if not decades:
+            return np.ones(self.diary_decades.shape[1], dtype=bool)
+        return self.diary_decades[[self.decades.index(d) for d in decades]].any(axis=0)
+
+def decade_codes(decades, known):
+    # position of each row's decade in known, or -1
+    return pd.Categorical(decades, categories=known).codes
+
+def bitmaps(codes, count):
+    rows = np.zeros((count, len(codes)), dtype=bool)
+    present = codes >= 0
+    rows[codes[present], np.flatnonzero(present)] = True
+    return rows
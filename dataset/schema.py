@@ -0,0 +1,90 @@
+import hashlib
+import itertools
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# columns holding lists of names, stored as arrow lists of int32 ids into one sorted
+# dictionary per column, so each name is kept once however many films share it
+LIST_COLUMNS = ['genres', 'themes', 'cast', 'directors', 'studios', 'countries']
+# repeated or long strings, stored as categoricals
+CATEGORY_COLUMNS = ['title', 'film_slug', 'language']
+# whole numbers stay nullable integers so they print as 1936 rather than 1936.0. runtimes
+# go past Int16 (some art films run for days) and watch/like counts into the millions
+INTEGER_COLUMNS = {'year': 'Int16', 'runtime': 'Int32', 'num_watched': 'Int32', 'num_liked': 'Int32'}
+# the charts pick their example films by these; each gets a <column>_rank column at ingest
+RANKED_COLUMNS = ['num_watched', 'num_liked', 'rating']
+
+def encode_list_column(lists):
+    lists = [items if isinstance(items, list) else [] for items in lists]
+    lengths = np.fromiter(map(len, lists), dtype=np.int32, count=len(lists))
+    offsets = np.zeros(len(lists) + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+
+    flat = np.array(list(itertools.chain.from_iterable(lists)), dtype=object)
+    names, ids = np.unique(flat.astype(str), return_inverse=True) if len(flat) else (np.array([], dtype=str), np.array([], dtype=np.int32))
+    items = pa.DictionaryArray.from_arrays(pa.array(ids, type=pa.int32()), pa.array(names, type=pa.string()))
+    return pd.arrays.ArrowExtensionArray(pa.ListArray.from_arrays(pa.array(offsets), items))
+
+def encode_category_column(values):
+    values = pd.Series(values, dtype=object)
+    categories = np.unique(values.dropna().astype(str))
+    return pd.Categorical(values, categories=categories)
+
+def rank_descending(values):
+    # 0 for the highest value, ties in library order, -1 where the value is missing
+    values = values.to_numpy(dtype=float, na_value=np.nan)
+    ranks = np.empty(len(values), dtype=np.int32)
+    ranks[np.argsort(-values, kind='stable')] = np.arange(len(values))
+    ranks[np.isnan(values)] = -1
+    return ranks
+
+def decode_film_data(films_df):
+    # plain python lists and strings again, e.g. for the csv download
+    decoded = films_df.drop(columns=[f"{col}_rank" for col in RANKED_COLUMNS])
+    for col in LIST_COLUMNS:
+        decoded[col] = decoded[col].array.__arrow_array__().cast(pa.list_(pa.string())).to_pylist()
+    for col in CATEGORY_COLUMNS:
+        decoded[col] = decoded[col].astype(object)
+    return decoded
+
+def dataset_fingerprint(films_df, diary_df):
+    # content hash of a loaded profile, so sessions on identical data share cached figures
+    digest = hashlib.sha1()
+    for frame in (films_df, diary_df):
+        scalars = [col for col in frame.columns if col not in LIST_COLUMNS]
+        digest.update(','.join(scalars).encode())
+        digest.update(pd.util.hash_pandas_object(frame[scalars], index=True).to_numpy().tobytes())
+        for col in frame.columns.intersection(LIST_COLUMNS):
+            lists = frame[col].array.__arrow_array__()
+            names = pc.list_flatten(lists).cast(pa.string()).to_numpy(zero_copy_only=False)
+            digest.update(pc.list_value_length(lists).to_numpy(zero_copy_only=False).tobytes())
+            digest.update(pd.util.hash_array(names.astype(object)).tobytes())
+    return digest.hexdigest()
+
+def process_film_data(films_data):
+    films_df = pd.DataFrame(films_data)
+    for col in LIST_COLUMNS:
+        films_df[col] = encode_list_column(films_df[col])
+    for col in CATEGORY_COLUMNS:
+        films_df[col] = encode_category_column(films_df[col])
+    for col, dtype in INTEGER_COLUMNS.items():
+        films_df[col] = pd.to_numeric(films_df[col], errors='coerce').astype(dtype)
+    # ratings stay float64: the charts show their means to 2 decimals, and a mean of half
+    # stars often lands on .xx5, where float32 rounds the other way
+    for col in ['rating', 'avg_rating']:
+        films_df[col] = pd.to_numeric(films_df[col], errors='coerce')
+    # derived here once rather than written into the frame on every rerun, so the charts
+    # can read films_df from several threads at a time
+    films_df['decade'] = (films_df['year'] // 10) * 10
+    for col in RANKED_COLUMNS:
+        films_df[f"{col}_rank"] = rank_descending(films_df[col])
+    return films_df
+
+def process_diary_data(diary_entries):
+    # the columns are named so an empty diary (e.g. one that failed to load) still has them
+    diary_df = pd.DataFrame(diary_entries, columns=['name', 'film_slug', 'date', 'rating', 'year'])
+    diary_df['date'] = pd.to_datetime(diary_df['date'], format='%d %b %Y', errors='coerce').dt.normalize()
+    diary_df['year'] = pd.to_numeric(diary_df['year'], errors='coerce')
+    return diary_df
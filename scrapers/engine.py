@@ -0,0 +1,55 @@
+import asyncio
+import os
+import random
+import aiohttp
+from .rate_limit import get_rate_limiter
+
+# point the scrapers somewhere else, e.g. the local stand-in server in bench/
+BASE_URL = os.environ.get('LETTERBOXD_BASE_URL', 'https://letterboxd.com').rstrip('/')
+MAX_IN_FLIGHT = 24     # requests allowed in flight at once across a whole scrape
+MAX_RETRIES = 2
+REQUEST_TIMEOUT = 15
+
+class ScrapeEngine:
+    # one aiohttp session per scrape, with a cap on concurrent requests; the request rate
+    # itself is paced by the limiter shared with every other scrape
+    def __init__(self, headers, max_in_flight=MAX_IN_FLIGHT, limiter=None):
+        self.headers = headers
+        self.max_in_flight = max_in_flight
+        self.limiter = limiter or get_rate_limiter()
+        self.session = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        self.semaphore = asyncio.Semaphore(self.max_in_flight)
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+        self.session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    async def get(self, url, timeout=REQUEST_TIMEOUT):
+        # single attempt, returns (status, text) and leaves status handling to the caller
+        async with self.semaphore:
+            await self.limiter.acquire_async()
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                self.limiter.observe(response.status)
+                return response.status, await response.text()
+
+    async def fetch(self, url, timeout=5):
+        # async counterpart of make_request: retries and raises on error statuses
+        for attempt in range(MAX_RETRIES):
+            try:
+                status, text = await self.get(url, timeout)
+                if status == 403 or "403 Forbidden" in text:
+                    raise aiohttp.ClientError("403 Forbidden - Possible block")
+                if status >= 400:
+                    raise aiohttp.ClientError(f"Status {status} for {url}")
+                return text
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                # wait times between retries (outside the semaphore so other requests keep going)
+                wait_time = (1.2 ** attempt) + random.random() * 0.3
+                await asyncio.sleep(wait_time)
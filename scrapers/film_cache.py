@@ -0,0 +1,119 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.environ.get('BOXD_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'boxd-office'))
+STATIC_TTL = 30 * 24 * 3600    # genres, cast, crew, runtime etc. almost never change
+STATS_TTL = 3 * 24 * 3600      # watched/liked counts and average rating drift slowly
+MAX_CACHE_BYTES = 100 * 1024 * 1024
+COMPACT_EVERY = 1000           # writes between compaction passes
+
+STATIC_FIELDS = ['year', 'runtime', 'genres', 'themes', 'directors', 'cast', 'studios', 'countries', 'language']
+STATS_FIELDS = ['avg_rating', 'num_watched', 'num_liked']
+
+class FilmCache:
+    # film details shared across users, keyed by film_slug; the static fields and the
+    # community stats are stored and expired separately so they can be refreshed on their own
+    def __init__(self, path=None, static_ttl=STATIC_TTL, stats_ttl=STATS_TTL, max_bytes=MAX_CACHE_BYTES):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, 'film_details.sqlite')
+        self.static_ttl = static_ttl
+        self.stats_ttl = stats_ttl
+        self.max_bytes = max_bytes
+        self.writes = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        # auto_vacuum only takes effect on a fresh database, before any table exists
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS films (
+                slug TEXT PRIMARY KEY,
+                static TEXT,
+                static_at REAL,
+                stats TEXT,
+                stats_at REAL,
+                last_used REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS films_last_used ON films (last_used)")
+
+    def get(self, slug):
+        # returns (static, stats); either is None when missing or expired
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT static, static_at, stats, stats_at FROM films WHERE slug = ?", (slug,)
+            ).fetchone()
+            if row is None:
+                return None, None
+            self.conn.execute("UPDATE films SET last_used = ? WHERE slug = ?", (now, slug))
+
+        static_json, static_at, stats_json, stats_at = row
+        static = json.loads(static_json) if static_json and now - static_at < self.static_ttl else None
+        stats = json.loads(stats_json) if stats_json and now - stats_at < self.stats_ttl else None
+        return static, stats
+
+    def put(self, slug, details, static=True, stats=True):
+        # store the freshly fetched parts of details; parts not fetched keep their old values
+        now = time.time()
+        static_json = json.dumps({k: details[k] for k in STATIC_FIELDS}) if static else None
+        stats_json = json.dumps({k: details[k] for k in STATS_FIELDS}) if stats else None
+        size = len(slug) + len(static_json or '') + len(stats_json or '')
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO films (slug, static, static_at, stats, stats_at, last_used, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (slug) DO UPDATE SET
+                    static = COALESCE(excluded.static, static),
+                    static_at = COALESCE(excluded.static_at, static_at),
+                    stats = COALESCE(excluded.stats, stats),
+                    stats_at = COALESCE(excluded.stats_at, stats_at),
+                    last_used = excluded.last_used,
+                    size = length(slug) + ifnull(length(COALESCE(excluded.static, static)), 0)
+                        + ifnull(length(COALESCE(excluded.stats, stats)), 0)
+            """, (slug, static_json, now if static else None, stats_json, now if stats else None, now, size))
+            self.writes += 1
+            due = self.writes % COMPACT_EVERY == 0
+
+        if due:
+            self.compact()
+
+    def compact(self):
+        # drop fully expired rows, evict least recently used ones past the size budget,
+        # then hand the freed pages back to the filesystem
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM films WHERE (static_at IS NULL OR static_at < ?) AND (stats_at IS NULL OR stats_at < ?)",
+                (now - self.static_ttl, now - self.stats_ttl)
+            )
+            total = self.conn.execute("SELECT ifnull(sum(size), 0) FROM films").fetchone()[0]
+            if total > self.max_bytes:
+                # evict down to 90% of the budget so we don't end up evicting on every write
+                excess = total - int(self.max_bytes * 0.9)
+                self.conn.execute("""
+                    DELETE FROM films WHERE slug IN (
+                        SELECT slug FROM (
+                            SELECT slug, size, sum(size) OVER (ORDER BY last_used, slug) AS running FROM films
+                        ) WHERE running - size < ?
+                    )
+                """, (excess,))
+            self.conn.execute("PRAGMA incremental_vacuum")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_film_cache():
+    # one cache per process, opened on first use
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FilmCache()
+        return _cache
@@ -0,0 +1,67 @@
+import os
+from bs4 import BeautifulSoup
+from bs4.filter import ElementFilter
+
+# lxml builds trees in C and is several times faster than the pure-python html.parser,
+# fall back to html.parser when lxml isn't installed
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+PARSER = os.environ.get('BOXD_HTML_PARSER', DEFAULT_PARSER)
+
+class TagFilter(ElementFilter):
+    # only builds the subtrees rooted at tags matching one of the (name, attribute, value) rules,
+    # everything else in the document is tokenized and thrown away
+    def __init__(self, rules):
+        super().__init__()
+        self.rules = rules
+
+    @property
+    def includes_everything(self):
+        return False
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        attrs = attrs or {}
+        for rule_name, attr, value in self.rules:
+            if name != rule_name or attr not in attrs:
+                continue
+            actual = attrs[attr]
+            if attr == 'class':
+                actual = actual.split() if isinstance(actual, str) else actual
+                if value in actual:
+                    return True
+            elif actual == value:
+                return True
+        return False
+
+    def allow_string_creation(self, string):
+        return False
+
+# the parts of each page the scrapers actually read
+FILM_PAGE = TagFilter([
+    ('section', 'class', 'production-masthead'),
+    ('meta', 'property', 'og:title'),
+    ('p', 'class', 'text-link'),
+    ('div', 'id', 'tab-genres'),
+    ('div', 'id', 'tab-crew'),
+    ('div', 'id', 'tab-cast'),
+    ('div', 'id', 'tab-details'),
+])
+
+FILMS_LIST_PAGE = TagFilter([
+    ('li', 'class', 'griditem'),
+    ('a', 'class', 'next'),
+    ('div', 'class', 'paginate-pages'),
+    ('span', 'class', 'js-former-count'),
+])
+
+DIARY_PAGE = TagFilter([
+    ('tr', 'class', 'diary-entry-row'),
+])
+
+def make_soup(html, only=None):
+    # only: a TagFilter limiting the tree to the tags we read
+    return BeautifulSoup(html, PARSER, parse_only=only)
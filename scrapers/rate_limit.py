@@ -0,0 +1,104 @@
+import asyncio
+import os
+import struct
+import threading
+import time
+from .film_cache import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:   # windows: limit within this process only
+    fcntl = None
+
+RATE = float(os.environ.get('BOXD_RATE_LIMIT', 30))    # requests per second to letterboxd.com, across all processes
+BURST = float(os.environ.get('BOXD_RATE_BURST', 60))   # requests allowed back to back after a quiet spell
+MAX_SLOWDOWN = 16           # 429/403 responses divide the rate by up to this much
+RECOVERY_HALF_LIFE = 30     # seconds for the slowdown to halve once the site stops pushing back
+THROTTLE_STATUSES = (429, 403)
+THROTTLE_WINDOW = 1         # throttled responses this close together count once (they were all in flight together)
+
+# tokens, updated_at, slowdown, throttled_at
+STATE = struct.Struct('dddd')
+
+class RateLimiter:
+    # token bucket shared through a small state file, so every thread, event loop and
+    # app worker process on this machine draws from the same budget
+    def __init__(self, path=None, rate=RATE, burst=BURST):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, 'rate_limit.state')
+        self.rate = rate
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644) if fcntl else None
+        self.state = (burst, time.time(), 1.0, 0.0)
+
+    def update(self, change):
+        # change(tokens, updated_at, slowdown, throttled_at, now) -> (new state, result)
+        with self.lock:
+            if self.fd is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                if self.fd is not None:
+                    data = os.pread(self.fd, STATE.size, 0)
+                    if len(data) == STATE.size:
+                        self.state = STATE.unpack(data)
+                state, result = change(*self.state, time.time())
+                self.state = state
+                if self.fd is not None:
+                    os.pwrite(self.fd, STATE.pack(*state), 0)
+            finally:
+                if self.fd is not None:
+                    fcntl.flock(self.fd, fcntl.LOCK_UN)
+        return result
+
+    def slowdown(self, slowdown, throttled_at, now):
+        # the slowdown halves every RECOVERY_HALF_LIFE seconds after the last throttled response
+        return max(1.0, slowdown * 0.5 ** (max(0.0, now - throttled_at) / RECOVERY_HALF_LIFE))
+
+    def reserve(self):
+        # takes a token and returns how long to wait before using it; tokens can go
+        # negative, which queues callers behind each other at the current rate
+        def change(tokens, updated_at, slowdown, throttled_at, now):
+            rate = self.rate / self.slowdown(slowdown, throttled_at, now)
+            tokens = min(self.burst, tokens + max(0.0, now - updated_at) * rate) - 1
+            return (tokens, now, slowdown, throttled_at), max(0.0, -tokens / rate)
+
+        return self.update(change)
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def throttled(self):
+        # called on 429/403: halve the rate and drop any saved up burst
+        def change(tokens, updated_at, slowdown, throttled_at, now):
+            rate = self.rate / self.slowdown(slowdown, throttled_at, now)
+            tokens = min(0.0, tokens + max(0.0, now - updated_at) * rate)
+            if now - throttled_at >= THROTTLE_WINDOW:
+                slowdown = min(MAX_SLOWDOWN, self.slowdown(slowdown, throttled_at, now) * 2)
+                throttled_at = now
+            return (tokens, now, slowdown, throttled_at), None
+
+        self.update(change)
+
+    def observe(self, status):
+        if status in THROTTLE_STATUSES:
+            self.throttled()
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    # one limiter per process, all backed by the same state file
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -1,7 +1,9 @@
-import requests
-from bs4 import BeautifulSoup
+from datetime import datetime
+import asyncio
 import csv
-import time
+from .engine import ScrapeEngine, BASE_URL
+from .html_parsing import make_soup, DIARY_PAGE
+from .scrape_films import parse_total_pages
 
 star_to_rating = {
     "★": 1,
@@ -17,110 +19,185 @@ star_to_rating = {
     None: None
 }
 
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+class DiaryIncomplete(Exception):
+    # a diary page failed to load; entries is the diary up to the page before it
+    def __init__(self, message, entries):
+        super().__init__(message)
+        self.entries = entries
+
+def parse_diary_date(date):
+    # diary dates look like '7 Mar 2024'
+    try:
+        return datetime.strptime(date, '%d %b %Y').date()
+    except (TypeError, ValueError):
+        return None
+
+def parse_diary_rows(html):
+    # returns (entry, day, month, year) per row; month and year are only set on the first
+    # row of each month, so dates are filled in by stitch_diary_dates once the pages
+    # before this one are known
+    soup = make_soup(html, only=DIARY_PAGE)
+    rows = soup.find_all('tr', class_='diary-entry-row')
+    parsed = []
+
+    for row in rows:
+        # extract film slug from the react component data
+        react_component = row.find('div', class_='react-component')
+        film_slug = None
+        if react_component and 'data-item-slug' in react_component.attrs:
+            film_slug = react_component['data-item-slug']
+        
+        # alternative: extract from data-postered-identifier
+        if not film_slug:
+            poster_div = row.find('div', class_='poster')
+            if poster_div and poster_div.find('a'):
+                film_link = poster_div.find('a')['href']
+                # Extract film slug from film link (more generic approach)
+                if '/film/' in film_link:
+                    film_slug = film_link.split('/film/')[-1].strip('/')
+
+        # film name
+        name_h2 = row.find('h2', class_='name')
+        if name_h2:
+            film_name_link = name_h2.find('a')
+            film_name = film_name_link.get_text(strip=True) if film_name_link else None
+        else:
+            film_name = None
+
+        # check if this row has month/year information (first entry of the month)
+        month_link = row.find('a', class_='month')
+        year_link = row.find('a', class_='year')
+        day_link = row.find('a', class_='daydate')
+        
+        month = None
+        year = None
+        if month_link and year_link:
+            month = month_link.get_text(strip=True)
+            year = year_link.get_text(strip=True)
+        day = day_link.get_text(strip=True) if day_link else None
+
+        rating = None
+        rating_div = row.find('td', class_='col-rating')
+        if rating_div:
+            # look for the input field with the rating value
+            rating_input = rating_div.find('input', class_='rateit-field')
+            if rating_input and 'value' in rating_input.attrs:
+                # convert from 0-10 scale to 0-5 scale with half increments
+                rating_value = int(rating_input['value'])
+                if rating_value > 0:
+                    rating = rating_value / 2.0
+
+        # year
+        year_td = row.find('td', class_='col-releaseyear')
+        release_year = None
+        if year_td:
+            year_span = year_td.find('span')
+            release_year = year_span.get_text(strip=True) if year_span else None
+
+        # alternative year extraction from release date span
+        if not release_year:
+            release_span = row.find('span', class_='releasedate')
+            if release_span:
+                release_link = release_span.find('a')
+                release_year = release_link.get_text(strip=True) if release_link else None
+
+        parsed.append(({
+            'name': film_name,
+            'film_slug': film_slug,
+            'date': None,
+            'rating': rating,
+            'year': release_year
+        }, day, month, year))
+
+    return parsed
+
+def stitch_diary_dates(pages, current_month=None, current_year=None):
+    # pages: parse_diary_rows results in page order. the current month and year carry
+    # over from row to row and from the end of one page into the next
+    entries = []
+    for rows in pages:
+        for entry, day, month, year in rows:
+            # update current month/year if this row has them
+            if month and year:
+                current_month = month
+                current_year = year
+            if day and current_month and current_year:
+                entry['date'] = f"{day} {current_month} {current_year}"
+            entries.append(entry)
+
+    return entries
+
 def get_diary_entries(username):
-    base_url = f"https://letterboxd.com/{username}/films/diary/page/{{}}/"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
+    async def run():
+        async with ScrapeEngine(HEADERS) as engine:
+            return await scrape_diary(engine, username)
 
-    all_entries = []
-    page = 1
+    return asyncio.run(run())
 
-    while True:
-        print(f"Scraping page {page}...")
-        response = requests.get(base_url.format(page), headers=headers)
-        if response.status_code != 200:
-            print(f"Failed to fetch page {page}. Status code: {response.status_code}")
-            break
-            
-        soup = BeautifulSoup(response.text, 'html.parser')
-        rows = soup.find_all('tr', class_='diary-entry-row')
+async def fetch_diary_rows(engine, url, page):
+    # engine.fetch retries and raises on errors, so a page that won't load fails the scrape
+    # instead of cutting the diary short
+    print(f"Scraping page {page}...")
+    return parse_diary_rows(await engine.fetch(url))
+
+async def scrape_diary(engine, username, since=None):
+    # with since (a date), stop at the first page that reaches entries older than it
+    base_url = f"{BASE_URL}/{username}/films/diary/page/{{}}/"
 
+    # page 1 gives the page count, the rest are fetched concurrently
+    print("Scraping page 1...")
+    try:
+        text = await engine.fetch(base_url.format(1))
+    except Exception as e:
+        raise DiaryIncomplete(f"diary page 1 failed: {str(e)[:200]}", []) from e
+    first_rows = parse_diary_rows(text)
+    if not first_rows:
+        print("No more entries found.")
+        return []
+
+    total_pages = parse_total_pages(text)
+    if since:
+        return await scrape_diary_since(engine, base_url, since, first_rows, total_pages)
+
+    rest = await asyncio.gather(*(
+        fetch_diary_rows(engine, base_url.format(page), page) for page in range(2, total_pages + 1)
+    ), return_exceptions=True)
+
+    # an empty page ends the diary, as it would when walking the pages one by one
+    pages = [first_rows]
+    for page, rows in enumerate(rest, start=2):
+        if isinstance(rows, Exception):
+            raise DiaryIncomplete(f"diary page {page} failed: {str(rows)[:200]}", stitch_diary_dates(pages)) from rows
         if not rows:
-            print("No more entries found.")
             break
+        pages.append(rows)
 
-        # track current month and year for entries that don't have them explicitly
-        current_month = None
-        current_year = None
+    return stitch_diary_dates(pages)
 
-        for row in rows:
-            # extract film slug from the react component data
-            react_component = row.find('div', class_='react-component')
-            film_slug = None
-            if react_component and 'data-item-slug' in react_component.attrs:
-                film_slug = react_component['data-item-slug']
-            
-            # alternative: extract from data-postered-identifier
-            if not film_slug:
-                poster_div = row.find('div', class_='poster')
-                if poster_div and poster_div.find('a'):
-                    film_link = poster_div.find('a')['href']
-                    # Extract film slug from film link (more generic approach)
-                    if '/film/' in film_link:
-                        film_slug = film_link.split('/film/')[-1].strip('/')
-
-            # film name
-            name_h2 = row.find('h2', class_='name')
-            if name_h2:
-                film_name_link = name_h2.find('a')
-                film_name = film_name_link.get_text(strip=True) if film_name_link else None
-            else:
-                film_name = None
-
-            # check if this row has month/year information (first entry of the month)
-            month_link = row.find('a', class_='month')
-            year_link = row.find('a', class_='year')
-            day_link = row.find('a', class_='daydate')
-            
-            # update current month/year if this row has them
-            if month_link and year_link:
-                current_month = month_link.get_text(strip=True)
-                current_year = year_link.get_text(strip=True)
-            
-            date = None
-            if day_link and current_month and current_year:
-                day = day_link.get_text(strip=True)
-                date = f"{day} {current_month} {current_year}"
-
-            rating = None
-            rating_div = row.find('td', class_='col-rating')
-            if rating_div:
-                # look for the input field with the rating value
-                rating_input = rating_div.find('input', class_='rateit-field')
-                if rating_input and 'value' in rating_input.attrs:
-                    # convert from 0-10 scale to 0-5 scale with half increments
-                    rating_value = int(rating_input['value'])
-                    if rating_value > 0:
-                        rating = rating_value / 2.0
-
-            # year
-            year_td = row.find('td', class_='col-releaseyear')
-            year = None
-            if year_td:
-                year_span = year_td.find('span')
-                year = year_span.get_text(strip=True) if year_span else None
-
-            # alternative year extraction from release date span
-            if not year:
-                release_span = row.find('span', class_='releasedate')
-                if release_span:
-                    year_link = release_span.find('a')
-                    year = year_link.get_text(strip=True) if year_link else None
-
-            all_entries.append({
-                'name': film_name,
-                'film_slug': film_slug,
-                'date': date,
-                'rating': rating,
-                'year': year
-            })
+async def scrape_diary_since(engine, base_url, since, first_rows, total_pages):
+    # incremental syncs usually only need the first page, so walk pages one at a time
+    pages = [first_rows]
+    page = 1
 
-        page += 1
-        time.sleep(1)
+    while True:
+        entries = stitch_diary_dates(pages)[-len(pages[-1]):]
+        if any(d and d < since for d in (parse_diary_date(e['date']) for e in entries)):
+            break
+        if page >= total_pages:
+            break
 
-    return all_entries
+        page += 1
+        rows = await fetch_diary_rows(engine, base_url.format(page), page)
+        if not rows:
+            print("No more entries found.")
+            break
+        pages.append(rows)
 
+    return stitch_diary_dates(pages)
 
 # test the scraper
 if __name__ == "__main__":
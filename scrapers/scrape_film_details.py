@@ -1,7 +1,15 @@
-from bs4 import BeautifulSoup
-import time
-import random
+import asyncio
+import concurrent.futures
+import copy
 import re
+import threading
+from .engine import BASE_URL
+from .html_parsing import make_soup, FILM_PAGE
+
+# film detail fetches currently running in any session of this process, keyed by
+# (film_slug, uses cache); each maps to a future with the details
+_in_flight = {}
+_in_flight_lock = threading.Lock()
 
 def get_digits(text):
     if not text:
@@ -31,8 +39,8 @@ def parse_stat_number(text):
     except (ValueError, TypeError):
         return None
 
-def get_film_details(film_slug, session):
-    details = {
+def empty_details():
+    return {
         'avg_rating': None,
         'num_watched': None,
         'num_liked': None,
@@ -47,95 +55,151 @@ def get_film_details(film_slug, session):
         'language': None
     }
 
-    try:
-        film_url = f"https://letterboxd.com/film/{film_slug}/"
-        response = session.get(film_url, timeout=15)
-        
-        if response.status_code != 200:
-            raise Exception(f"Status {response.status_code} for {film_url}")
+def parse_film_page(html, details):
+    soup = make_soup(html, only=FILM_PAGE)
+
+    # get year
+    production_section = soup.find('section', class_='production-masthead')
+    if production_section:
+        releaseyear_div = production_section.find('div', class_='releaseyear')
+        if releaseyear_div:
+            year_link = releaseyear_div.find('a')
+            if year_link:
+                details['year'] = year_link.text.strip()
+    if not details['year']:
+        release_year = soup.find('meta', {'property': 'og:title'})
+        if release_year and 'content' in release_year.attrs:
+            year_match = re.search(r'\((\d{4})\)', release_year['content'])
+            if year_match:
+                details['year'] = year_match.group(1)
+
+    # get runtime
+    runtime_tag = soup.find('p', class_='text-link')
+    if runtime_tag:
+        details['runtime'] = get_digits(runtime_tag.get_text(strip=True))
+
+    # get genres and themes
+    genre_div = soup.find('div', id='tab-genres')
+    if genre_div:
+        details['genres'] = [a.text.strip() for a in genre_div.find_all('a', href=lambda x: x and '/films/genre/' in x)]
+        details['themes'] = [a.text.strip() for a in genre_div.find_all('a', href=lambda x: x and ('/films/theme/' in x or '/films/mini-theme/' in x))]
+
+    # get directors
+    director_div = soup.find('div', id='tab-crew')
+    if director_div:
+        details['directors'] = [a.text.strip() for a in director_div.find_all('a', href=lambda x: x and '/director/' in x)]
+
+    # get cast (first 12)
+    actor_div = soup.find('div', id='tab-cast')
+    if actor_div:
+        details['cast'] = [a.text.strip() for a in actor_div.find_all('a', href=lambda x: x and '/actor/' in x)[:12]]
+
+    details_div = soup.find('div', id='tab-details')
+    if details_div:
+        # get studios
+        studio_links = details_div.find_all('a', href=lambda x: x and '/studio/' in x)
+        details['studios'] = [link.text.strip() for link in studio_links]
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # get year
-        production_section = soup.find('section', class_='production-masthead')
-        if production_section:
-            releaseyear_div = production_section.find('div', class_='releaseyear')
-            if releaseyear_div:
-                year_link = releaseyear_div.find('a')
-                if year_link:
-                    details['year'] = year_link.text.strip()
-        if not details['year']:
-            release_year = soup.find('meta', {'property': 'og:title'})
-            if release_year and 'content' in release_year.attrs:
-                year_match = re.search(r'\((\d{4})\)', release_year['content'])
-                if year_match:
-                    details['year'] = year_match.group(1)
-
-        # get runtime
-        runtime_tag = soup.find('p', class_='text-link')
-        if runtime_tag:
-            details['runtime'] = get_digits(runtime_tag.get_text(strip=True))
-
-        # get genres and themes
-        genre_div = soup.find('div', id='tab-genres')
-        if genre_div:
-            details['genres'] = [a.text.strip() for a in genre_div.find_all('a', href=lambda x: x and '/films/genre/' in x)]
-            details['themes'] = [a.text.strip() for a in genre_div.find_all('a', href=lambda x: x and ('/films/theme/' in x or '/films/mini-theme/' in x))]
-
-        # get directors
-        director_div = soup.find('div', id='tab-crew')
-        if director_div:
-            details['directors'] = [a.text.strip() for a in director_div.find_all('a', href=lambda x: x and '/director/' in x)]
-
-        # get cast (first 12)
-        actor_div = soup.find('div', id='tab-cast')
-        if actor_div:
-            details['cast'] = [a.text.strip() for a in actor_div.find_all('a', href=lambda x: x and '/actor/' in x)[:12]]
-
-        details_div = soup.find('div', id='tab-details')
-        if details_div:
-            # get studios
-            studio_links = details_div.find_all('a', href=lambda x: x and '/studio/' in x)
-            details['studios'] = [link.text.strip() for link in studio_links]
-            
-            # get countries
-            country_links = details_div.find_all('a', href=lambda x: x and '/films/country/' in x)
-            details['countries'] = [link.text.strip() for link in country_links]
-
-            # get language
-            lang_header = details_div.find('h3', string=lambda t: t and ('Language' in t or 'Primary Language' in t))
-            if lang_header:
-                lang_block = lang_header.find_next_sibling('div')
-                if lang_block:
-                    lang_link = lang_block.find('a')
-                    details['language'] = lang_link.text.strip() if lang_link else None
-
-        # get number of members watched and liked
-        stats_url = f"https://letterboxd.com/csi/film/{film_slug}/stats/"
-        stats_response = session.get(stats_url, timeout=10)
-        if stats_response.status_code == 200:
-            stats_soup = BeautifulSoup(stats_response.text, 'html.parser')
-            stats_text = stats_soup.get_text().split()
-            if len(stats_text) >= 3:
-                details['num_watched'] = parse_stat_number(stats_text[0])
-                details['num_liked'] = parse_stat_number(stats_text[2])
-
-        # get average rating
-        ratings_url = f"https://letterboxd.com/csi/film/{film_slug}/ratings-summary/"
-        ratings_response = session.get(ratings_url, timeout=10)
-        if ratings_response.status_code == 200:
-            ratings_soup = BeautifulSoup(ratings_response.text, 'html.parser')
-            ratings_text = ratings_soup.get_text()
-            match = re.search(r'(\d+\.\d+)\s+★', ratings_text)
-            if match:
-                average_rating = match.group(1)
-                details['avg_rating'] = float(average_rating)
-
-        # small delay between api calls
-        time.sleep(0.1 + random.random() * 0.5)
-
-    except Exception as e:
-        print(f"Error processing {film_slug}: {str(e)}")
+        # get countries
+        country_links = details_div.find_all('a', href=lambda x: x and '/films/country/' in x)
+        details['countries'] = [link.text.strip() for link in country_links]
+
+        # get language
+        lang_header = details_div.find('h3', string=lambda t: t and ('Language' in t or 'Primary Language' in t))
+        if lang_header:
+            lang_block = lang_header.find_next_sibling('div')
+            if lang_block:
+                lang_link = lang_block.find('a')
+                details['language'] = lang_link.text.strip() if lang_link else None
+
+def parse_stats(html, details):
+    # get number of members watched and liked
+    stats_soup = make_soup(html)
+    stats_text = stats_soup.get_text().split()
+    if len(stats_text) >= 3:
+        details['num_watched'] = parse_stat_number(stats_text[0])
+        details['num_liked'] = parse_stat_number(stats_text[2])
+
+def parse_ratings_summary(html, details):
+    # get average rating
+    ratings_soup = make_soup(html)
+    ratings_text = ratings_soup.get_text()
+    match = re.search(r'(\d+\.\d+)\s+★', ratings_text)
+    if match:
+        average_rating = match.group(1)
+        details['avg_rating'] = float(average_rating)
+
+async def fetch_film_details(film_slug, engine, cache=None):
+    # the film page, stats and ratings summary are requested concurrently, and
+    # only the parts missing from the cache are fetched
+    details = empty_details()
+    static, stats = cache.get(film_slug) if cache else (None, None)
+    if static:
+        details.update(static)
+    if stats:
+        details.update(stats)
+
+    requests = []
+    if static is None:
+        requests.append((f"{BASE_URL}/film/{film_slug}/", 15, parse_film_page))
+    if stats is None:
+        requests.append((f"{BASE_URL}/csi/film/{film_slug}/stats/", 10, parse_stats))
+        requests.append((f"{BASE_URL}/csi/film/{film_slug}/ratings-summary/", 10, parse_ratings_summary))
+    if not requests:
         return film_slug, details
 
-    return film_slug, details
\ No newline at end of file
+    responses = await asyncio.gather(
+        *(engine.get(url, timeout) for url, timeout, _ in requests),
+        return_exceptions=True
+    )
+
+    parsed = set()
+    for (url, _, parse), response in zip(requests, responses):
+        try:
+            if isinstance(response, BaseException):
+                raise response
+            status, text = response
+            if status != 200:
+                if parse is parse_film_page:
+                    raise Exception(f"Status {status} for {url}")
+                continue
+            parse(text, details)
+            parsed.add(parse)
+        except Exception as e:
+            print(f"Error processing {film_slug}: {str(e)}")
+
+    # only cache the parts that came back complete
+    if cache:
+        fetched_static = parse_film_page in parsed
+        fetched_stats = {parse_stats, parse_ratings_summary} <= parsed
+        if fetched_static or fetched_stats:
+            cache.put(film_slug, details, static=fetched_static, stats=fetched_stats)
+
+    return film_slug, details
+
+async def fetch_film_details_shared(film_slug, engine, cache=None):
+    # like fetch_film_details, but concurrent calls for the same slug (from any session,
+    # thread or event loop) share a single fetch and all get its result
+    key = (film_slug, cache is not None)
+    with _in_flight_lock:
+        shared = _in_flight.get(key)
+        leader = shared is None
+        if leader:
+            shared = _in_flight[key] = concurrent.futures.Future()
+
+    if not leader:
+        # shielded so a cancelled follower does not cancel the shared fetch for the others
+        details = await asyncio.shield(asyncio.wrap_future(shared))
+        if details is None:
+            # the fetching session went away before finishing, fetch it ourselves
+            return await fetch_film_details_shared(film_slug, engine, cache)
+        return film_slug, copy.deepcopy(details)
+
+    details = None
+    try:
+        _, details = await fetch_film_details(film_slug, engine, cache)
+        return film_slug, details
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+        shared.set_result(copy.deepcopy(details))
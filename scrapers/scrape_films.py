@@ -1,19 +1,20 @@
 import requests
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import threading
 import time
 import random
-from .scrape_film_details import get_film_details
-import functools
+from queue import Queue
+from .engine import ScrapeEngine, MAX_IN_FLIGHT, BASE_URL
+from .scrape_film_details import fetch_film_details_shared
+from .film_cache import get_film_cache
+from .html_parsing import make_soup, FILMS_LIST_PAGE
+from .rate_limit import get_rate_limiter
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Accept-Language': 'en-US,en;q=0.9'
 }
-BASE_DELAY = 0.1
 MAX_RETRIES = 2   
-MAX_THREADS = 12       # threads for parallel processing
-MAX_PAGE_THREADS = 6   # threads for page scraping
 DEBUG = True
 
 star_to_rating = {
@@ -26,9 +27,12 @@ SESSION = requests.Session()
 SESSION.headers.update(HEADERS)
 
 def make_request(url):
+    limiter = get_rate_limiter()
     for attempt in range(MAX_RETRIES):
         try:
+            limiter.acquire()
             response = SESSION.get(url, timeout=5)
+            limiter.observe(response.status_code)
             response.raise_for_status()
             
             if response.status_code == 403 or "403 Forbidden" in response.text:
@@ -42,157 +46,268 @@ def make_request(url):
             wait_time = (1.2 ** attempt) + random.random() * 0.3
             time.sleep(wait_time)
 
-def scrape_films_page(url):
-    try:
-        response = make_request(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        film_list = soup.find_all('li', class_='griditem')
-        
-        page_films = []
-        for film in film_list:
-            try:
-                react_component = film.find('div', class_='react-component')
-                if not react_component:
-                    continue
-                
-                film_slug = react_component.get('data-item-slug')
-                if not film_slug:
-                    continue
-                
-                film_title = react_component.get('data-item-name', 'Unknown')
-                
-                # extracting ratings and likes
-                viewing_data = film.find('p', class_='poster-viewingdata')
-                rating = None
-                liked = False
-                
-                if viewing_data:
-                    rating_span = viewing_data.find('span', class_='rating')
-                    if rating_span:
-                        rating_text = rating_span.get_text(strip=True)
-                        rating = star_to_rating.get(rating_text, None)
-                    
-                    like_span = viewing_data.find('span', class_='like')
-                    if like_span:
-                        liked = 'icon-liked' in ' '.join(like_span.get('class', []))
-                
-                page_films.append({
-                    'title': film_title,
-                    'liked': liked,
-                    'rating': rating,
-                    'film_slug': film_slug
-                })
-                
-            except Exception as e:
-                if DEBUG:
-                    print(f"Error parsing individual film: {str(e)}")
+def parse_films_page(html):
+    soup = make_soup(html, only=FILMS_LIST_PAGE)
+    film_list = soup.find_all('li', class_='griditem')
+    
+    page_films = []
+    for film in film_list:
+        try:
+            react_component = film.find('div', class_='react-component')
+            if not react_component:
                 continue
-        
-        return page_films, soup.find('a', class_='next') is not None
-        
+            
+            film_slug = react_component.get('data-item-slug')
+            if not film_slug:
+                continue
+            
+            film_title = react_component.get('data-item-name', 'Unknown')
+            
+            # extracting ratings and likes
+            viewing_data = film.find('p', class_='poster-viewingdata')
+            rating = None
+            liked = False
+            
+            if viewing_data:
+                rating_span = viewing_data.find('span', class_='rating')
+                if rating_span:
+                    rating_text = rating_span.get_text(strip=True)
+                    rating = star_to_rating.get(rating_text, None)
+                
+                like_span = viewing_data.find('span', class_='like')
+                if like_span:
+                    liked = 'icon-liked' in ' '.join(like_span.get('class', []))
+            
+            page_films.append({
+                'title': film_title,
+                'liked': liked,
+                'rating': rating,
+                'film_slug': film_slug
+            })
+            
+        except Exception as e:
+            if DEBUG:
+                print(f"Error parsing individual film: {str(e)}")
+            continue
+    
+    return page_films, soup.find('a', class_='next') is not None
+
+def parse_total_pages(html):
+    soup = make_soup(html, only=FILMS_LIST_PAGE)
+    
+    # check pagination links
+    pagination = soup.find('div', class_='paginate-pages')
+    if pagination:
+        links = pagination.find_all('a')
+        if links:
+            last_page = max(int(link.text) for link in links if link.text.isdigit())
+            return last_page
+    
+    # estimate from film count
+    film_count_elem = soup.find('span', class_='js-former-count')
+    if film_count_elem:
+        film_count = int(film_count_elem.text.replace(',', ''))
+        # assuming ~24 films per page
+        return max(1, (film_count + 23) // 24)
+
+    return 1
+
+async def fetch_films_page(engine, url):
+    # page_films is None when the page couldn't be fetched or parsed
+    try:
+        return parse_films_page(await engine.fetch(url))
     except Exception as e:
         print(f"Error scraping page {url}: {str(e)[:200]}")
+        return None, False
+
+def get_films(username, max_in_flight=MAX_IN_FLIGHT, use_cache=True):
+    # runs the whole scrape on one event loop; max_in_flight caps concurrent requests
+    async def run():
+        async with ScrapeEngine(HEADERS, max_in_flight) as engine:
+            return await scrape_films(engine, username, use_cache)
+
+    return asyncio.run(run())
+
+def iter_films(username, batch_size=50, max_in_flight=MAX_IN_FLIGHT, use_cache=True):
+    # yields lists of enriched films (the same records get_films returns, one per film) as
+    # their details finish
+    return iter_scrape(lambda engine: scrape_film_batches(engine, username, batch_size, use_cache), max_in_flight)
+
+def iter_scrape(scrape, max_in_flight=MAX_IN_FLIGHT):
+    # yields what the async generator scrape(engine) yields. the scrape runs on its own
+    # thread and event loop so it keeps going while the caller works on an item
+    batches = Queue()
+    running = {}
+
+    async def run():
+        running['loop'] = asyncio.get_running_loop()
+        running['task'] = asyncio.current_task()
+        async with ScrapeEngine(HEADERS, max_in_flight) as engine:
+            async for batch in scrape(engine):
+                batches.put(batch)
+
+    def worker():
+        try:
+            asyncio.run(run())
+            batches.put(None)
+        except BaseException as e:
+            batches.put(e)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if isinstance(batch, BaseException):
+                raise batch
+            yield batch
+    finally:
+        # stop the scrape if the caller stopped iterating early
+        if thread.is_alive() and 'task' in running:
+            running['loop'].call_soon_threadsafe(running['task'].cancel)
+
+async def scrape_film_batches(engine, username, batch_size=50, use_cache=True):
+    print(f"\n{'='*50}\nScraping film list for @{username}\n{'='*50}")
+
+    listed = {}
+    queue = DetailQueue(engine, use_cache)
+    def add_page(page_films):
+        for film in page_films:
+            listed.setdefault(film['film_slug'], film)
+        queue.add(page_films)
+
+    listing = asyncio.create_task(
+        scrape_film_list(engine, f"{BASE_URL}/{username}/films/", on_page=add_page)
+    )
+
+    batch = []
+    async for slug, details in queue.completed(listing):
+        batch.append({**listed[slug], **details})
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+    await listing
+
+async def scrape_films(engine, username, use_cache=True):
+    print(f"\n{'='*50}\nScraping film list for @{username}\n{'='*50}")
+    
+    # details start downloading as soon as each list page is parsed
+    queue = DetailQueue(engine, use_cache)
+    films, _ = await scrape_film_list(engine, f"{BASE_URL}/{username}/films/", on_page=queue.add)
+    return combine_details(films, await queue.results())
+
+async def scrape_film_list(engine, base_url, on_page=None):
+    # returns (films, complete); complete is False when a page failed or came back empty,
+    # so films may be missing from the list. page 1 gives both the page count and the first films
+    try:
+        first_html = await engine.fetch(base_url)
+    except Exception as e:
+        print(f"Error scraping page {base_url}: {str(e)[:200]}")
         return [], False
 
-def get_total_pages(base_url):
+    complete = True
     try:
-        response = make_request(base_url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # check pagination links
-        pagination = soup.find('div', class_='paginate-pages')
-        if pagination:
-            links = pagination.find_all('a')
-            if links:
-                last_page = max(int(link.text) for link in links if link.text.isdigit())
-                return last_page
-        
-        # estimate from film count
-        film_count_elem = soup.find('span', class_='js-former-count')
-        if film_count_elem:
-            film_count = int(film_count_elem.text.replace(',', ''))
-            # assuming ~24 films per page
-            return max(1, (film_count + 23) // 24)
-            
+        total_pages = parse_total_pages(first_html)
     except Exception as e:
         if DEBUG:
             print(f"Couldn't determine total pages: {e}")
-    
-    return 1  # fallback to single page
-
-def get_films(username):
-    base_url = f"https://letterboxd.com/{username}/films/"
-    films = []
-    
-    print(f"\n{'='*50}\nScraping film list for @{username}\n{'='*50}")
-    
-    # determine total pages
-    total_pages = get_total_pages(base_url)
+        total_pages = 1  # fallback to single page
+        complete = False
     if DEBUG:
         print(f"Detected {total_pages} total pages")
-    
-    # generate all page URLs
-    page_urls = [base_url] + [f"{base_url}page/{page}/" for page in range(2, total_pages + 1)]
-    
-    # scrape all pages in parallel with minimal delays
-    with ThreadPoolExecutor(max_workers=MAX_PAGE_THREADS) as executor:
-        future_to_url = {executor.submit(scrape_films_page, url): url for url in page_urls}
-        
+
+    try:
+        first_films, _ = parse_films_page(first_html)
+    except Exception as e:
+        print(f"Error scraping page {base_url}: {str(e)[:200]}")
+        first_films = []
+        complete = False
+
+    async def scrape_page(url):
+        page_films, _ = await fetch_films_page(engine, url)
+        if on_page and page_films:
+            on_page(page_films)
+        return page_films
+
+    if on_page:
+        on_page(first_films)
+
+    # scrape the remaining pages concurrently, keeping them in page order. every page up to
+    # the page count has films, so an empty one means it didn't load properly
+    page_urls = [f"{base_url}page/{page}/" for page in range(2, total_pages + 1)]
+    pages = await asyncio.gather(*(scrape_page(url) for url in page_urls))
+    complete = complete and all(pages)
+    films = first_films + [film for page_films in pages if page_films for film in page_films]
+
+    if DEBUG:
+        print(f"\nTotal films found: {len(films)}{'' if complete else ' (some pages failed)'}")
+
+    return films, complete
+
+class DetailQueue:
+    # starts one detail fetch per slug as films are added, so detail fetching
+    # overlaps with list pagination instead of waiting for it
+    def __init__(self, engine, use_cache=True):
+        self.engine = engine
+        # film details are shared between users, so most of them usually come from the cache
+        self.cache = get_film_cache() if use_cache else None
+        self.tasks = {}
+        self.titles = {}
+        self.finished = asyncio.Queue()
+
+    def add(self, films):
+        for film in films:
+            slug = film['film_slug']
+            if slug not in self.tasks:
+                self.titles[slug] = film['title']
+                self.tasks[slug] = asyncio.create_task(fetch_film_details_shared(slug, self.engine, self.cache))
+                self.tasks[slug].add_done_callback(self.finished.put_nowait)
+
+    async def completed(self, listing):
+        # yields (slug, details) as each fetch finishes, until the listing task that feeds
+        # this queue is done and every film it added has come back
+        listing.add_done_callback(lambda _: self.finished.put_nowait(None))
+        listing_done = False
+        seen = 0
+
+        while not (listing_done and seen == len(self.tasks)):
+            task = await self.finished.get()
+            if task is None:
+                listing_done = True
+                continue
+            seen += 1
+            try:
+                slug, details = task.result()
+            except Exception as e:
+                print(f"Failed to process film: {str(e)[:200]}")
+                continue
+            yield slug, details
+
+    async def results(self):
+        film_details = {}
+        total_films = len(self.tasks)
         completed = 0
-        for future in as_completed(future_to_url):
-            url = future_to_url[future]
+        batch_size = 25
+        
+        for next_done in asyncio.as_completed(list(self.tasks.values())):
             try:
-                page_films, has_next = future.result()
-                films.extend(page_films)
+                slug, details = await next_done
+                film_details[slug] = details
                 completed += 1
                 
-                if DEBUG:
-                    print(f"Scraped {url}: {len(page_films)} films ({completed}/{len(page_urls)} pages)")
-                    
-                # delay to be polite
-                if completed % 5 == 0:
-                    time.sleep(0.05)
-                    
+                if DEBUG and completed % batch_size == 0:
+                    print(f"Processed {completed}/{total_films}: {self.titles[slug][:30]}...")
+                
             except Exception as e:
-                print(f"Failed to scrape {url}: {str(e)[:200]}")
+                print(f"Failed to process film: {str(e)[:200]}")
 
-    if DEBUG:
-        print(f"\nTotal films found: {len(films)}")
-    
-    # scraping film details
-    film_details = {}
-    total_films = len(films)
-    
-    if films:
-        detail_func = functools.partial(get_film_details, session=SESSION)
-        
-        # process all film details in parallel
-        with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-            futures = {executor.submit(detail_func, film['film_slug']): film['film_slug'] for film in films}
-            
-            completed = 0
-            batch_size = 25
-            
-            for future in as_completed(futures):
-                slug = futures[future]
-                try:
-                    _, details = future.result()
-                    film_details[slug] = details
-                    completed += 1
-                    
-                    # progress reporting without significant delays
-                    if DEBUG and completed % batch_size == 0:
-                        title = next((f['title'] for f in films if f['film_slug'] == slug), "Unknown")
-                        print(f"Processed {completed}/{total_films}: {title[:30]}...")
-                        
-                        # delay every few batches
-                        if completed % (batch_size * 4) == 0:
-                            time.sleep(0.1)
-                    
-                except Exception as e:
-                    print(f"Failed to process {slug}: {str(e)[:200]}")
-    
-    # combine results
+        return film_details
+
+def combine_details(films, film_details):
     final_data = []
     for film in films:
         slug = film['film_slug']
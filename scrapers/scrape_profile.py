@@ -0,0 +1,26 @@
+import asyncio
+from .engine import MAX_IN_FLIGHT
+from .scrape_films import iter_scrape, scrape_film_batches
+from .scrape_diary import scrape_diary, DiaryIncomplete
+
+def iter_profile(username, batch_size=50, max_in_flight=MAX_IN_FLIGHT, use_cache=True):
+    # yields ('films', batch) as film details finish, like iter_films, then ('diary', entries).
+    # if a diary page fails, ('warning', message) comes first and entries is the diary up to it.
+    # films (list pages and details) and diary pages share one engine and request limit,
+    # so the whole scrape takes about as long as its slowest stage
+    return iter_scrape(lambda engine: scrape_profile_batches(engine, username, batch_size, use_cache), max_in_flight)
+
+async def scrape_profile_batches(engine, username, batch_size=50, use_cache=True):
+    diary = asyncio.create_task(scrape_diary(engine, username))
+    try:
+        async for batch in scrape_film_batches(engine, username, batch_size, use_cache):
+            yield 'films', batch
+        try:
+            entries = await diary
+        except DiaryIncomplete as e:
+            # the films can take minutes to load, so keep them and what loaded of the diary
+            yield 'warning', f"Only part of your diary could be loaded ({e})"
+            entries = e.entries
+        yield 'diary', entries
+    finally:
+        diary.cancel()
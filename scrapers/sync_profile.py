@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from .engine import ScrapeEngine, MAX_IN_FLIGHT, BASE_URL
+from .film_cache import CACHE_DIR
+from .scrape_films import HEADERS, DEBUG, DetailQueue, fetch_films_page, scrape_film_list
+from .scrape_diary import scrape_diary, parse_diary_date
+
+FULL_SYNC_EVERY = 7 * 24 * 3600   # walk the whole film list this often to catch rating/like changes on older films
+
+class ProfileStore:
+    # last synced films and diary entries per username, stored as compressed json
+    def __init__(self, path=None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, 'profiles.sqlite')
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS profiles (
+                username TEXT PRIMARY KEY,
+                films BLOB NOT NULL,
+                diary BLOB NOT NULL,
+                synced_at REAL NOT NULL,
+                full_synced_at REAL NOT NULL
+            )
+        """)
+
+    def load(self, username):
+        # returns (films, diary, full_synced_at), or None for a profile we haven't seen
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT films, diary, full_synced_at FROM profiles WHERE username = ?", (username.lower(),)
+            ).fetchone()
+        if row is None:
+            return None
+        films, diary, full_synced_at = row
+        return json.loads(zlib.decompress(films)), json.loads(zlib.decompress(diary)), full_synced_at
+
+    def save(self, username, films, diary, full):
+        now = time.time()
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO profiles (username, films, diary, synced_at, full_synced_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (username) DO UPDATE SET
+                    films = excluded.films,
+                    diary = excluded.diary,
+                    synced_at = excluded.synced_at,
+                    full_synced_at = CASE WHEN ? THEN excluded.full_synced_at ELSE full_synced_at END
+            """, (
+                username.lower(),
+                zlib.compress(json.dumps(films).encode('utf-8')),
+                zlib.compress(json.dumps(diary).encode('utf-8')),
+                now,
+                now if full else 0,
+                full
+            ))
+
+    def forget(self, username):
+        with self.lock:
+            self.conn.execute("DELETE FROM profiles WHERE username = ?", (username.lower(),))
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_profile_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProfileStore()
+        return _store
+
+def sync_profile(username, max_in_flight=MAX_IN_FLIGHT, full=False, use_cache=True):
+    # same (films, diary_entries) as get_films + get_diary_entries, but only fetches
+    # what changed since the last sync of this username
+    async def run():
+        async with ScrapeEngine(HEADERS, max_in_flight) as engine:
+            return await scrape_profile_changes(engine, username, full, use_cache)
+
+    return asyncio.run(run())
+
+async def scrape_profile_changes(engine, username, full=False, use_cache=True):
+    # a profile we haven't seen syncs as one with nothing saved, which walks every page
+    store = get_profile_store()
+    saved_films, saved_diary, full_synced_at = store.load(username) or ([], [], 0)
+    full = full or time.time() - full_synced_at > FULL_SYNC_EVERY
+
+    (films, full), diary = await asyncio.gather(
+        sync_films(engine, username, saved_films, full, use_cache),
+        sync_diary(engine, username, saved_diary)
+    )
+    # a full walk that missed pages isn't recorded as one, so the next sync walks again
+    store.save(username, films, diary, full)
+    return films, diary
+
+async def sync_films(engine, username, saved_films, full=False, use_cache=True):
+    # returns (films, whether a full walk saw every page). the film grid lists the most
+    # recently added films first, so we page through it until a whole page is already
+    # known with the same rating and like
+    base_url = f"{BASE_URL}/{username}/films/"
+    known = {film['film_slug']: (film['rating'], film['liked']) for film in saved_films}
+    saved_by_slug = {film['film_slug']: film for film in saved_films}
+
+    # new films need details; they start downloading as soon as their page is parsed. on a
+    # full walk known films go through the film cache too, so their community stats are
+    # refetched once they've expired there
+    queue = DetailQueue(engine, use_cache)
+    def queue_films(page_films):
+        queue.add([film for film in page_films if film['film_slug'] not in known or (full and use_cache)])
+
+    if full:
+        listed, complete = await scrape_film_list(engine, base_url, on_page=queue_films)
+    else:
+        listed = []
+        complete = False
+        page = 1
+        while True:
+            url = base_url if page == 1 else f"{base_url}page/{page}/"
+            page_films, has_next = await fetch_films_page(engine, url)
+            if page_films is None:
+                break
+            queue_films(page_films)
+            listed.extend(page_films)
+            if not has_next or all(known.get(f['film_slug']) == (f['rating'], f['liked']) for f in page_films):
+                break
+            page += 1
+
+    if DEBUG:
+        print(f"Sync found {len(listed)} listed films, {sum(f['film_slug'] not in known for f in listed)} new")
+    details = await queue.results()
+
+    # known films pick up the fresh rating/like and any refreshed details; a failed fetch
+    # leaves fields empty, and those keep their saved values
+    films = []
+    for film in listed:
+        slug = film['film_slug']
+        fresh = details.get(slug, {})
+        if slug in saved_by_slug:
+            fresh = {k: v for k, v in fresh.items() if v is not None and v != []}
+        films.append({**saved_by_slug.get(slug, {}), **film, **fresh})
+
+    # a full walk that saw every page lists every film, so anything missing from it was
+    # removed from the profile; otherwise unlisted films keep their saved rows
+    complete = full and complete
+    if not complete:
+        listed_slugs = {film['film_slug'] for film in listed}
+        films.extend(film for film in saved_films if film['film_slug'] not in listed_slugs)
+
+    return films, complete
+
+async def sync_diary(engine, username, saved_diary):
+    # entries on or after the newest saved date are refetched, since more may have been
+    # logged that day; everything older is kept from the saved diary
+    saved_dates = [parse_diary_date(entry['date']) for entry in saved_diary]
+    last_date = max((d for d in saved_dates if d), default=None)
+    if last_date is None:
+        return await scrape_diary(engine, username)
+
+    try:
+        fetched = await scrape_diary(engine, username, since=last_date)
+    except Exception as e:
+        print(f"Error syncing diary, keeping the saved one: {str(e)[:200]}")
+        return saved_diary
+    fetched_dates = [parse_diary_date(entry['date']) for entry in fetched]
+
+    new_count = next((i for i, d in enumerate(fetched_dates) if d and d < last_date), len(fetched))
+    old_start = next((i for i, d in enumerate(saved_dates) if d and d < last_date), len(saved_diary))
+
+    # the fetch has to reach the saved entries before last_date to be spliced onto them;
+    # if it stopped short, keep the saved diary rather than lose the entries in between
+    if new_count == len(fetched) and old_start < len(saved_diary):
+        return saved_diary
+    return fetched[:new_count] + saved_diary[old_start:]
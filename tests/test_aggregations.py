@@ -0,0 +1,54 @@
+import pandas as pd
+from dataset.aggregations import top_titles, summarize_entities
+from dataset.entities import FilmEntities
+from dataset.schema import process_film_data
+from visualizations.actors.popular_actors import plot_popular_actors
+from visualizations.directors.popular_directors import plot_popular_directors
+from visualizations.runtime.runtime_histogram import plot_runtime_histogram
+
+ENTITY_COLUMNS = ['liked', 'title', 'num_watched_rank', 'rating_rank']
+
+def film(i, rating=None, cast=('Actor A', 'Actor B')):
+    return {
+        'title': f"Film {i}", 'film_slug': f"film-{i}", 'liked': i % 2 == 0, 'rating': rating,
+        'avg_rating': 3.5, 'num_watched': 1000 - i, 'num_liked': 10, 'year': '2001', 'runtime': 95,
+        'genres': ['Drama'], 'themes': [], 'directors': ['Director A'], 'cast': list(cast),
+        'studios': [], 'countries': [], 'language': 'English'
+    }
+
+def unrated_films():
+    return process_film_data([film(i) for i in range(5)])
+
+def test_top_titles_without_ratings_on_categorical_groups():
+    films_df = unrated_films()
+    films_df['bin'] = pd.cut(films_df['runtime'], bins=[0, 60, 120, 180])
+    titles = top_titles(films_df, 'bin', 'rating', index=films_df['bin'].cat.categories)
+    assert len(titles) == 3
+    assert all(t == [] for t in titles)
+
+def test_top_titles_fills_groups_without_ranked_rows():
+    films_df = process_film_data([film(0, 4.5, ['Actor A']), film(1, None, ['Actor B'])])
+    rows = FilmEntities(films_df).rows(films_df, 'cast', ENTITY_COLUMNS)
+    titles = top_titles(rows, 'cast', 'rating', index=['Actor A', 'Actor B'])
+    assert titles.tolist() == [['Film 0'], []]
+
+def test_top_titles_keeps_top_n_per_group_in_rank_order():
+    films_df = process_film_data([film(i, cast=['Actor A'] if i % 2 else ['Actor B']) for i in range(8)])
+    rows = FilmEntities(films_df).rows(films_df, 'cast', ENTITY_COLUMNS)
+    titles = top_titles(rows, 'cast', 'num_watched', top_n=2)
+    assert titles.index.tolist() == ['Actor A', 'Actor B']
+    assert titles.tolist() == [['Film 1', 'Film 3'], ['Film 0', 'Film 2']]
+
+def test_summarize_entities_without_ratings():
+    films_df = unrated_films()
+    summary = summarize_entities(FilmEntities(films_df).rows(films_df, 'cast', ENTITY_COLUMNS), 'cast')
+    assert summary['total'].tolist() == [5, 5]
+    assert all(favourites == [] for favourites in summary['favourites'])
+    assert summary['examples'].iloc[0] == ['Film 0', 'Film 1', 'Film 2']
+
+def test_charts_without_ratings():
+    films_df = unrated_films()
+    film_entities = FilmEntities(films_df)
+    plot_popular_actors(films_df, film_entities)
+    plot_popular_directors(films_df, film_entities)
+    plot_runtime_histogram(films_df)
@@ -1,26 +1,69 @@
+import os
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
 ORANGE = "#ff8000"
 GREEN = "#00e054"
 BLUE = "#40bbf4"
 GRAY = "#202831"
 DARK_GRAY = "#15191e"
 
-def format_with_linebreaks(items, max_line_length=100):
-    lines = []
-    current_line = ""
-    for i, item in enumerate(items):
-        is_last = (i == len(items) - 1)
-        addition = item if is_last else item + ", "
-        if len(current_line) + len(addition) > max_line_length:
-            lines.append(current_line.rstrip())
-            current_line = ""
-        current_line += addition
-    if current_line:
-        lines.append(current_line.rstrip())
-    return "<br>".join(lines)
-
-def format_number(num):
-    if num >= 1_000_000:
-        return f"{num/1_000_000:.1f}m"
-    elif num >= 1_000:
-        return f"{num/1_000:.1f}k"
-    return str(int(num))
+# scatter-type charts with more points than this are drawn with webgl; same cutoff as
+# plotly express's render_mode='auto'
+WEBGL_POINTS = int(os.environ.get('BOXD_WEBGL_POINTS', 1000))
+
+def format_lists_with_linebreaks(lists, max_line_length=100):
+    # every list in lists (anything else counts as empty) joined with ", ", starting a new
+    # line with <br> wherever the next item would run past max_line_length, as an array of
+    # strings. walks the lists one position at a time, so each step is vectorized across all of them
+    lists = pd.Series(list(lists), dtype=object)
+    counts = lists.str.len().fillna(0).to_numpy(dtype=int)
+    finished = np.full(len(lists), '', dtype=object)
+    current = np.full(len(lists), '', dtype=object)
+
+    for i in range(counts.max(initial=0)):
+        active = np.flatnonzero(counts > i)
+        item = lists.iloc[active].str[i].to_numpy(dtype=object)
+        addition = np.where(counts[active] == i + 1, item, item + ", ")
+        line = current[active]
+        breaks = text_length(line) + text_length(addition) > max_line_length
+        finished[active[breaks]] += text(np.char.rstrip(text(line[breaks]).astype(str))) + "<br>"
+        current[active] = np.where(breaks, '', line) + addition
+
+    last = text(np.char.rstrip(current.astype(str)))
+    return np.where(current != '', finished + last, pd.Series(finished, dtype=object).str[:-4].to_numpy(dtype=object))
+
+def text(values):
+    # each value as an f-string shows it, as an object array that works with + and np.where
+    return np.asarray(values, dtype=object).astype(str).astype(object)
+
+def text_length(values):
+    return np.char.str_len(np.asarray(values, dtype=object).astype(str))
+
+def fixed(values, decimals):
+    # f"{value:.<decimals>f}" for each value
+    return text(np.char.mod(f"%.{decimals}f", np.asarray(values, dtype=float)))
+
+def hover_label(label, color=None):
+    # "<b>label:</b> " with the label in color if given, for writing into a hovertemplate
+    span = f"<span style='color:{color}'>" if color else "<span>"
+    return f"{span}<b>{label}:</b></span> "
+
+def hover_field(label, values, color=None):
+    # hover_label followed by each value, for the fields only some points have
+    return hover_label(label, color) + text(values)
+
+def format_numbers(nums):
+    # each of nums shortened like 2.1m or 327.4k, or as a whole number below 1,000
+    nums = np.asarray(nums, dtype=float)
+    return np.select(
+        [nums >= 1_000_000, nums >= 1_000],
+        [fixed(nums / 1_000_000, 1) + "m", fixed(nums / 1_000, 1) + "k"],
+        text(np.trunc(nums).astype(np.int64))
+    )
+
+def scatter_trace(num_points):
+    # go.Scatter, or go.Scattergl past WEBGL_POINTS so the browser isn't keeping an svg
+    # element per point. both take the same marker, line and hover settings used here
+    return go.Scattergl if num_points > WEBGL_POINTS else go.Scatter
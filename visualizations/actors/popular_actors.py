@@ -1,37 +1,19 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, BLUE, GRAY
+from dataset.entities import FilmEntities
+from dataset.aggregations import summarize_entities
+from utils import format_lists_with_linebreaks, hover_label, BLUE, GRAY
 
-def plot_popular_actors(films_df: pd.DataFrame):
-    exploded = films_df.explode('cast')
-    exploded = exploded.dropna(subset=['cast'])
+def plot_popular_actors(films_df: pd.DataFrame, film_entities: FilmEntities):
+    rows = film_entities.rows(films_df, 'cast', ['liked', 'title', 'num_watched_rank', 'rating_rank'])
+    actor_data = summarize_entities(rows, 'cast').rename(columns={'cast': 'actor'})
 
-    actor_counts = exploded.groupby('cast').size().reset_index(name='total')
-    liked_counts = exploded[exploded['liked']].groupby('cast').size().reset_index(name='liked')
-    actor_data = pd.merge(actor_counts, liked_counts, on='cast', how='left').fillna(0)
-    actor_data['liked'] = actor_data['liked'].astype(int)
-    actor_data['unliked'] = actor_data['total'] - actor_data['liked']
-
-    actor_data.rename(columns={'cast': 'actor'}, inplace=True)
-
-    actor_examples = exploded.groupby('cast').apply(
-        lambda x: x.nlargest(3, 'num_watched')['title'].tolist()
-    )
-
-    actor_data = actor_data.merge(
-        actor_examples.rename('examples'),
-        left_on='actor',
-        right_index=True
-    )
-
-    actor_data['hover_text'] = actor_data.apply(
-        lambda row: (
-            f"<span style='color:{BLUE}'><b>Number of Films:</b></span> {row['total']}<br>" +
-            f"<span style='color:{BLUE}'><b>Liked:</b></span> {row['liked']} "
-            f"({round(100 * row['liked'] / row['total'])}%)<br>" +
-            f"<span style='color:{BLUE}'><b>Examples:</b></span> {format_with_linebreaks(row['examples'])}"
-        ),
-        axis=1
+    actor_data['examples'] = format_lists_with_linebreaks(actor_data['examples'])
+    hover_columns = ['total', 'liked', 'liked_pct', 'examples']
+    hover_template = (
+        hover_label('Number of Films', BLUE) + "%{customdata[0]}<br>" +
+        hover_label('Liked', BLUE) + "%{customdata[1]} (%{customdata[2]}%)<br>" +
+        hover_label('Examples', BLUE) + "%{customdata[3]}<extra></extra>"
     )
 
     actor_data = actor_data.sort_values('total', ascending=True).tail(20)
@@ -44,8 +26,8 @@ def plot_popular_actors(films_df: pd.DataFrame):
         name='Not Liked',
         orientation='h',
         marker_color='white',
-        customdata=actor_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=actor_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.add_trace(go.Bar(
@@ -54,8 +36,8 @@ def plot_popular_actors(films_df: pd.DataFrame):
         name='Liked',
         orientation='h',
         marker_color=BLUE,
-        customdata=actor_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=actor_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.update_layout(
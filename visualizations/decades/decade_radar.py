@@ -1,12 +1,11 @@
 import pandas as pd
 import plotly.graph_objects as go
+import numpy as np
 from utils import BLUE, GRAY
 
 def plot_decades_rating_radar(films_df: pd.DataFrame, top_n: int = 18):
-    films_df['decade'] = (films_df['year'] // 10) * 10
-
     # drop any rows with missing rating or decade
-    filtered = films_df.dropna(subset=['decade', 'rating', 'avg_rating'])
+    filtered = films_df.assign(decade=(films_df['year'] // 10) * 10).dropna(subset=['decade', 'rating', 'avg_rating'])
 
     avg_ratings = (
         filtered.groupby('decade')['rating']
@@ -33,14 +32,11 @@ def plot_decades_rating_radar(films_df: pd.DataFrame, top_n: int = 18):
     film_counts = film_counts.loc[top_decades]
 
     categories = [f"{decade}s" for decade in avg_ratings.index.tolist()]
-    values = avg_ratings.tolist()
-    community_values = community_avg_ratings.tolist()
-    counts = film_counts.tolist()
-
     categories.append(categories[0])
-    values.append(values[0])
-    community_values.append(community_values[0])
-    counts.append(counts[0])
+    loop = np.append(np.arange(len(avg_ratings)), 0)
+    values = avg_ratings.to_numpy(dtype=float)[loop]
+    community_values = community_avg_ratings.to_numpy(dtype=float)[loop]
+    counts = film_counts.to_numpy()[loop]
 
     fig = go.Figure()
 
@@ -51,10 +47,10 @@ def plot_decades_rating_radar(films_df: pd.DataFrame, top_n: int = 18):
         name='Community Ratings',
         line=dict(color='white', width=2),
         marker=dict(size=6),
-        customdata=[[cat, val, cnt] for cat, val, cnt in zip(categories, community_values, counts)],
-        hovertemplate="<b>Decade:</b> %{customdata[0]}<br>" +
-                      "<b>Average Rating:</b> %{customdata[1]:.2f}<br>" +
-                      "<b>Number of Films:</b> %{customdata[2]}<extra></extra>",
+        customdata=np.column_stack([community_values, counts]),
+        hovertemplate="<b>Decade:</b> %{theta}<br>" +
+                      "<b>Average Rating:</b> %{customdata[0]:.2f}<br>" +
+                      "<b>Number of Films:</b> %{customdata[1]}<extra></extra>",
         visible='legendonly'
     ))
 
@@ -65,10 +61,10 @@ def plot_decades_rating_radar(films_df: pd.DataFrame, top_n: int = 18):
         name='Your Ratings',
         line=dict(color=BLUE),
         marker=dict(size=6),
-        customdata=[[cat, val, cnt] for cat, val, cnt in zip(categories, values, counts)],
-        hovertemplate="<span style='color:" + BLUE + "'><b>Decade:</b></span> %{customdata[0]}<br>" +
-                      "<span style='color:" + BLUE + "'><b>Average Rating:</b></span> %{customdata[1]:.2f}<br>" +
-                      "<span style='color:" + BLUE + "'><b>Number of Films:</b></span> %{customdata[2]}<extra></extra>"
+        customdata=np.column_stack([values, counts]),
+        hovertemplate="<span style='color:" + BLUE + "'><b>Decade:</b></span> %{theta}<br>" +
+                      "<span style='color:" + BLUE + "'><b>Average Rating:</b></span> %{customdata[0]:.2f}<br>" +
+                      "<span style='color:" + BLUE + "'><b>Number of Films:</b></span> %{customdata[1]}<extra></extra>"
     ))
 
     fig.update_layout(
@@ -1,47 +1,24 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, BLUE, GRAY
+import numpy as np
+from dataset.aggregations import summarize_entities
+from utils import format_lists_with_linebreaks, hover_label, hover_field, BLUE, GRAY
 
 def plot_popular_decades(films_df: pd.DataFrame):
     films_df = films_df.dropna(subset=['year'])
-    films_df['decade'] = (films_df['year'] // 10 * 10).astype(int).astype(str) + "s"
+    decade_data = summarize_entities(films_df.assign(decade=(films_df['year'] // 10 * 10).astype(int).astype(str) + "s"), 'decade')
 
-    decade_counts = films_df.groupby('decade').size().reset_index(name='total')
-    liked_counts = films_df[films_df['liked']].groupby('decade').size().reset_index(name='liked')
-    decade_data = pd.merge(decade_counts, liked_counts, on='decade', how='left').fillna(0)
-    decade_data['liked'] = decade_data['liked'].astype(int)
-    decade_data['unliked'] = decade_data['total'] - decade_data['liked']
-
-    decade_examples = films_df.groupby('decade').apply(
-        lambda x: x.nlargest(3, 'num_watched')['title'].tolist()
-    )
-    decade_favourites = films_df.dropna(subset=['rating']).groupby('decade').apply(
-        lambda x: x.sort_values('rating', ascending=False).head(3)['title'].tolist()
-    )
-
-    decade_data = decade_data.merge(
-        decade_examples.rename('examples'),
-        left_on='decade',
-        right_index=True
-    ).merge(
-        decade_favourites.rename('favourites'),
-        left_on='decade',
-        right_index=True,
-        how='left'
+    decade_data['examples'] = format_lists_with_linebreaks(decade_data['examples'])
+    decade_data['favourites'] = np.where(
+        decade_data['favourites'].str.len() > 0,
+        hover_field('Your Favourites', format_lists_with_linebreaks(decade_data['favourites']), BLUE),
+        ''
     )
-
-    decade_data['hover_text'] = decade_data.apply(
-        lambda row: (
-            f"<span style='color:{BLUE}'><b>Number of Films:</b></span> {row['total']}<br>" +
-            f"<span style='color:{BLUE}'><b>Liked:</b></span> {row['liked']} "
-            f"({round(100 * row['liked'] / row['total'])}%)<br>" +
-            f"<span style='color:{BLUE}'><b>Examples:</b></span> {format_with_linebreaks(row['examples'])}<br>" +
-            (
-                f"<span style='color:{BLUE}'><b>Your Favourites:</b></span> {format_with_linebreaks(row['favourites'])}"
-                if isinstance(row['favourites'], list) and row['favourites'] else ""
-            )
-        ),
-        axis=1
+    hover_columns = ['total', 'liked', 'liked_pct', 'examples', 'favourites']
+    hover_template = (
+        hover_label('Number of Films', BLUE) + "%{customdata[0]}<br>" +
+        hover_label('Liked', BLUE) + "%{customdata[1]} (%{customdata[2]}%)<br>" +
+        hover_label('Examples', BLUE) + "%{customdata[3]}<br>%{customdata[4]}<extra></extra>"
     )
 
     # sort by decade chronologically
@@ -56,8 +33,8 @@ def plot_popular_decades(films_df: pd.DataFrame):
         name='Not Liked',
         orientation='h',
         marker_color='white',
-        customdata=decade_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=decade_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.add_trace(go.Bar(
@@ -66,8 +43,8 @@ def plot_popular_decades(films_df: pd.DataFrame):
         name='Liked',
         orientation='h',
         marker_color=BLUE,
-        customdata=decade_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=decade_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.update_layout(
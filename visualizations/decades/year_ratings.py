@@ -1,6 +1,8 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, ORANGE, GRAY
+import numpy as np
+from dataset.aggregations import top_titles
+from utils import format_lists_with_linebreaks, hover_label, hover_field, ORANGE, GRAY
 
 def plot_yearly_average_ratings(films_df: pd.DataFrame):
     # drop rows with missing year or rating
@@ -10,7 +12,7 @@ def plot_yearly_average_ratings(films_df: pd.DataFrame):
 
     your_avg = your_grouped['rating'].mean()
     your_total = your_grouped.size()
-    your_examples = your_grouped.apply(lambda x: x.nlargest(3, 'num_watched')['title'].tolist())
+    your_examples = top_titles(valid, 'year', 'num_watched')
 
     overall_avg = your_grouped['avg_rating'].mean()
 
@@ -21,27 +23,10 @@ def plot_yearly_average_ratings(films_df: pd.DataFrame):
     }).fillna(0).astype({'total': 'int'})
 
     data['examples'] = your_examples
-
-    data['hover_text'] = data.apply(
-        lambda row: (
-            f"<span style='color:{ORANGE}'><b>Year:</b></span> {row.name}<br>" +
-            f"<span style='color:{ORANGE}'><b>Average Rating:</b></span> {row['your_avg']:.2f}<br>" +
-            f"<span style='color:{ORANGE}'><b>Number of Films:</b></span> {row['total']}<br>" + 
-            (
-                f"<span style='color:{ORANGE}'><b>Examples:</b></span> {format_with_linebreaks(row['examples'])}"
-                if isinstance(row['examples'], list) and row['examples'] else ""
-            )
-        ),
-        axis=1
-    )
-
-    data['hover_text_overall'] = data.apply(
-        lambda row: (
-            f"<span><b>Year:</b></span> {row.name}<br>" +
-            f"<span><b>Average Rating:</b></span> {row['overall_avg']:.2f}<br>" +
-            f"<span><b>Number of Films:</b></span> {row['total']}"
-        ),
-        axis=1
+    data['examples_text'] = np.where(
+        data['examples'].str.len() > 0,
+        hover_field('Examples', format_lists_with_linebreaks(data['examples']), ORANGE),
+        ''
     )
 
     data = data.sort_index()
@@ -55,8 +40,12 @@ def plot_yearly_average_ratings(films_df: pd.DataFrame):
         name='Community Ratings',
         line=dict(color='white', width=2),
         marker=dict(size=4),
-        customdata=data[['hover_text_overall']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=data['total'],
+        hovertemplate=(
+            hover_label('Year') + "%{x}<br>" +
+            hover_label('Average Rating') + "%{y:.2f}<br>" +
+            hover_label('Number of Films') + "%{customdata}<extra></extra>"
+        )
     ))
 
     fig.add_trace(go.Scatter(
@@ -66,8 +55,12 @@ def plot_yearly_average_ratings(films_df: pd.DataFrame):
         name='Your Ratings',
         line=dict(color=ORANGE, width=2),
         marker=dict(size=4),
-        customdata=data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=data[['total', 'examples_text']],
+        hovertemplate=(
+            hover_label('Year', ORANGE) + "%{x}<br>" +
+            hover_label('Average Rating', ORANGE) + "%{y:.2f}<br>" +
+            hover_label('Number of Films', ORANGE) + "%{customdata[0]}<br>%{customdata[1]}<extra></extra>"
+        )
     ))
 
     fig.update_layout(
@@ -1,55 +1,28 @@
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from utils import GRAY, GREEN
+from utils import hover_label, hover_field, GRAY, GREEN
 
 def plot_diary_chart(diary_df: pd.DataFrame):
-    # group by date: count and list of films
-    diary_daily = diary_df.groupby('date').agg({
-        'name': lambda x: ', '.join(x),
-    }).rename(columns={'name': 'films_list'}).reset_index()
-
-    diary_counts = diary_df.groupby('date').size().reset_index(name='films_watched')
-    diary_daily = pd.merge(diary_daily, diary_counts, on='date')
-
     end_date = pd.to_datetime('today').normalize()
     start_date = end_date - pd.Timedelta(weeks=52)
 
-    diary_daily = diary_daily[diary_daily['date'].between(start_date, end_date)]
-
-    all_dates = pd.date_range(start=start_date, end=end_date, freq='D').normalize()
-
-    diary_daily = pd.merge(
-        pd.DataFrame({'date': all_dates}),
-        diary_daily,
-        on='date',
-        how='left'
-    ).fillna({'films_watched': 0, 'films_list': ''})
-
-    diary_daily['films_watched'] = diary_daily['films_watched'].astype(int)
+    # group by date: count and list of films
+    daily = diary_df[diary_df['date'].between(start_date, end_date)].groupby('date')['name']
+    films_watched = daily.size()
+    films_list = daily.agg(', '.join)
 
     weekday_offset = start_date.weekday()
     num_days = (end_date - start_date).days + 1
     num_weeks = (num_days + 6) // 7
 
-    heatmap_data = np.zeros((7, num_weeks))
-    hover_dates = np.empty((7, num_weeks), dtype='datetime64[ns]')
-    valid_hover = np.full((7, num_weeks), False)
-    films_lists = np.empty((7, num_weeks), dtype=object)
-
-    for week in range(num_weeks):
-        for weekday in range(7):
-            current_date = start_date + pd.Timedelta(days=week * 7 + weekday - weekday_offset)
-            if current_date > end_date:
-                heatmap_data[weekday, week] = None
-                hover_dates[weekday, week] = None
-                continue
-            match = diary_daily[diary_daily['date'] == current_date]
-            if not match.empty:
-                heatmap_data[weekday, week] = match.iloc[0]['films_watched']
-                films_lists[weekday, week] = match.iloc[0]['films_list']
-            hover_dates[weekday, week] = current_date
-            valid_hover[weekday, week] = True
+    # one cell per day from the monday of start_date's week, filled weeks first and then
+    # turned so rows are weekdays and columns are weeks
+    cell_dates = pd.date_range(start=start_date - pd.Timedelta(days=weekday_offset), periods=num_weeks * 7, freq='D')
+    past_end = cell_dates > end_date
+    counts = films_watched.reindex(cell_dates, fill_value=0).to_numpy(dtype=np.float32)
+    counts[past_end] = np.nan
+    heatmap_data = counts.reshape(num_weeks, 7).T
 
     month_labels = []
     month_positions = []
@@ -93,30 +66,25 @@ def plot_diary_chart(diary_df: pd.DataFrame):
             green_rgba = f'rgba({int(GREEN[1:3], 16)}, {int(GREEN[3:5], 16)}, {int(GREEN[5:7], 16)}, {opacity})'
             colorscale.append([value, green_rgba])
 
-    hover_text = np.empty((7, num_weeks), dtype=object)
-    for i in range(7):
-        for j in range(num_weeks):
-            if valid_hover[i, j]:
-                date_str = pd.to_datetime(str(hover_dates[i, j])).strftime('%b %d, %Y')
-                count = int(heatmap_data[i, j])
-                film_names = films_lists[i, j] or ""
-                hover = (
-                    f"<span style='color:{GREEN}'><b>Date:</b></span> {date_str}<br>"
-                    f"<span style='color:{GREEN}'><b>Number of Films:</b></span> {count}"
-                )
-                if count > 0:
-                    hover += f"<br><span style='color:{GREEN}'><b>Films Watched:</b></span> {film_names}"
-                hover_text[i, j] = hover
-            else:
-                hover_text[i, j] = None
+    # per cell: the date, and the films watched with their label or nothing on empty days
+    films_text = np.where(
+        counts > 0,
+        "<br>" + hover_field('Films Watched', films_list.reindex(cell_dates, fill_value=''), GREEN),
+        ''
+    )
+    hover_data = np.stack([cell_dates.strftime('%b %d, %Y'), films_text], axis=-1).reshape(num_weeks, 7, 2).transpose(1, 0, 2)
 
     fig = go.Figure(data=go.Heatmap(
         z=heatmap_data,
         x=np.arange(num_weeks),
         y=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
         colorscale=colorscale,
-        hoverinfo='text',
-        hovertext=hover_text,
+        customdata=hover_data,
+        hovertemplate=(
+            hover_label('Date', GREEN) + "%{customdata[0]}<br>" +
+            hover_label('Number of Films', GREEN) + "%{z}%{customdata[1]}<extra></extra>"
+        ),
+        hoverongaps=False,
         showscale=False,
         xgap=1,
         ygap=1,
@@ -1,6 +1,6 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, BLUE, GRAY
+from utils import hover_label, scatter_trace, BLUE, GRAY
 
 def plot_rating_timeline(diary_df: pd.DataFrame):
     # drop rows without rating or date
@@ -9,26 +9,21 @@ def plot_rating_timeline(diary_df: pd.DataFrame):
     # sort by date
     valid = valid.sort_values('date')
 
-    valid['hover_text'] = valid.apply(
-        lambda row: (
-            f"<span style='color:{BLUE}'><b>Date:</b></span> {row['date'].strftime('%b %d, %Y')}<br>" +
-            f"<span style='color:{BLUE}'><b>Film:</b></span> {row['name']}<br>" +
-            f"<span style='color:{BLUE}'><b>Rating:</b></span> {row['rating']:.1f}"
-        ),
-        axis=1
-    )
-
     fig = go.Figure()
 
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter_trace(len(valid))(
         x=valid['date'],
-        y=valid['rating'],
+        y=valid['rating'].astype('float32'),
         mode='lines+markers',
         name='Your Ratings',
         line=dict(color=BLUE, width=2),
         marker=dict(size=4),
-        customdata=valid[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=valid['name'],
+        hovertemplate=(
+            hover_label('Date', BLUE) + "%{x|%b %d, %Y}<br>" +
+            hover_label('Film', BLUE) + "%{customdata}<br>" +
+            hover_label('Rating', BLUE) + "%{y:.1f}<extra></extra>"
+        )
     ))
 
     fig.update_layout(
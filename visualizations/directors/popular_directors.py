@@ -1,38 +1,20 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, ORANGE, GRAY
+from dataset.entities import FilmEntities
+from dataset.aggregations import summarize_entities
+from utils import format_lists_with_linebreaks, hover_label, ORANGE, GRAY
 
-def plot_popular_directors(films_df: pd.DataFrame):
+def plot_popular_directors(films_df: pd.DataFrame, film_entities: FilmEntities):
 
-    exploded = films_df.explode('directors')
-    exploded = exploded.dropna(subset=['directors'])
+    rows = film_entities.rows(films_df, 'directors', ['liked', 'title', 'num_watched_rank', 'rating_rank'])
+    director_data = summarize_entities(rows, 'directors').rename(columns={'directors': 'director'})
 
-    director_counts = exploded.groupby('directors').size().reset_index(name='total')
-    liked_counts = exploded[exploded['liked']].groupby('directors').size().reset_index(name='liked')
-    director_data = pd.merge(director_counts, liked_counts, on='directors', how='left').fillna(0)
-    director_data['liked'] = director_data['liked'].astype(int)
-    director_data['unliked'] = director_data['total'] - director_data['liked']
-
-    director_data.rename(columns={'directors': 'director'}, inplace=True)
-
-    director_examples = exploded.groupby('directors').apply(
-        lambda x: x.nlargest(3, 'num_watched')['title'].tolist()
-    )
-
-    director_data = director_data.merge(
-        director_examples.rename('examples'),
-        left_on='director',
-        right_index=True
-    )
-
-    director_data['hover_text'] = director_data.apply(
-        lambda row: (
-            f"<span style='color:{ORANGE}'><b>Number of Films:</b></span> {row['total']}<br>" +
-            f"<span style='color:{ORANGE}'><b>Liked:</b></span> {row['liked']} "
-            f"({round(100 * row['liked'] / row['total'])}%)<br>" +
-            f"<span style='color:{ORANGE}'><b>Examples:</b></span> {format_with_linebreaks(row['examples'])}"
-        ),
-        axis=1
+    director_data['examples'] = format_lists_with_linebreaks(director_data['examples'])
+    hover_columns = ['total', 'liked', 'liked_pct', 'examples']
+    hover_template = (
+        hover_label('Number of Films', ORANGE) + "%{customdata[0]}<br>" +
+        hover_label('Liked', ORANGE) + "%{customdata[1]} (%{customdata[2]}%)<br>" +
+        hover_label('Examples', ORANGE) + "%{customdata[3]}<extra></extra>"
     )
 
     director_data = director_data.sort_values('total', ascending=True).tail(20)
@@ -45,8 +27,8 @@ def plot_popular_directors(films_df: pd.DataFrame):
         name='Not Liked',
         orientation='h',
         marker_color='white',
-        customdata=director_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=director_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.add_trace(go.Bar(
@@ -55,8 +37,8 @@ def plot_popular_directors(films_df: pd.DataFrame):
         name='Liked',
         orientation='h',
         marker_color=ORANGE,
-        customdata=director_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=director_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.update_layout(
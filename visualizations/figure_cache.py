@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import plotly.io
+from visualizations.plotly_spec import DRAW_SPECS
+
+# engine plotly.io.to_json writes the cached specs with. plotly's 'auto' picks orjson when
+# it's installed, but its orjson path was slower than the json one on these figures
+JSON_ENGINE = os.environ.get('BOXD_JSON_ENGINE', 'json')
+
+FIGURE_CACHE_BYTES = int(float(os.environ.get('BOXD_FIGURE_CACHE_MB', 256)) * 1024 * 1024)
+FIGURE_WORKERS = int(os.environ.get('BOXD_FIGURE_WORKERS', os.cpu_count() or 4))
+
+class FigureCache:
+    # built figures and their serialized specs keyed by (dataset fingerprint, filters,
+    # chart, params), so an unchanged chart skips both building the figure and writing its
+    # json. one cache is shared by every session in the process, so people viewing the
+    # same profile reuse each other's charts. the least recently used ones are dropped
+    # past max_bytes. the figure itself is only kept when draw_figure falls back to
+    # st.plotly_chart and needs it; it holds about the same data as its spec, so a kept
+    # figure is counted as a second copy of the spec
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES, keep_figures=not DRAW_SPECS):
+        self.max_bytes = max_bytes
+        self.keep_figures = keep_figures
+        self.figures = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, build):
+        with self.lock:
+            if key in self.figures:
+                self.figures.move_to_end(key)
+                self.hits += 1
+                return self.figures[key]
+            self.misses += 1
+
+        # built outside the lock so sessions don't wait on each other's charts; the entry
+        # is (figure or None, spec, seconds spent serializing it)
+        fig = build()
+        start = time.perf_counter()
+        spec = plotly.io.to_json(fig, validate=False, engine=JSON_ENGINE)
+        entry = (fig if self.keep_figures else None, spec, time.perf_counter() - start)
+        size = entry_size(entry)
+        with self.lock:
+            if key not in self.figures and size <= self.max_bytes:
+                self.figures[key] = entry
+                self.size += size
+                while self.size > self.max_bytes:
+                    _, dropped = self.figures.popitem(last=False)
+                    self.size -= entry_size(dropped)
+        return entry
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'figures': len(self.figures), 'bytes': self.size}
+
+def entry_size(entry):
+    fig, spec, _ = entry
+    return len(spec) * (1 if fig is None else 2)
+
+_figure_cache = None
+_figure_cache_lock = threading.Lock()
+
+def get_figure_cache():
+    global _figure_cache
+    with _figure_cache_lock:
+        if _figure_cache is None:
+            _figure_cache = FigureCache()
+        return _figure_cache
+
+_figure_pool = None
+
+def get_figure_pool():
+    # one pool for every session, so concurrent visitors share the cores instead of each
+    # starting a pool of their own
+    global _figure_pool
+    with _figure_cache_lock:
+        if _figure_pool is None:
+            _figure_pool = ThreadPoolExecutor(max_workers=FIGURE_WORKERS, thread_name_prefix='figures')
+        return _figure_pool
+
+def figure_key(dataset_key, filters, plot, params):
+    # params are the chart's keyword arguments besides the data; lists become tuples so
+    # the key hashes
+    params = tuple(sorted((name, tuple(value) if isinstance(value, list) else value) for name, value in params.items()))
+    return (dataset_key, filters, f"{plot.__module__}.{plot.__qualname__}", params)
@@ -1,49 +1,25 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, BLUE, GRAY
+import numpy as np
+from dataset.entities import FilmEntities
+from dataset.aggregations import summarize_entities
+from utils import format_lists_with_linebreaks, hover_label, hover_field, BLUE, GRAY
 
-def plot_popular_genres(films_df: pd.DataFrame):
-    exploded = films_df.explode('genres')
-    exploded = exploded.dropna(subset=['genres'])
+def plot_popular_genres(films_df: pd.DataFrame, film_entities: FilmEntities):
+    rows = film_entities.rows(films_df, 'genres', ['liked', 'title', 'num_watched_rank', 'rating_rank'])
+    genre_data = summarize_entities(rows, 'genres').rename(columns={'genres': 'genre'})
 
-    genre_counts = exploded.groupby('genres').size().reset_index(name='total')
-    liked_counts = exploded[exploded['liked']].groupby('genres').size().reset_index(name='liked')
-    genre_data = pd.merge(genre_counts, liked_counts, on='genres', how='left').fillna(0)
-    genre_data['liked'] = genre_data['liked'].astype(int)
-    genre_data['unliked'] = genre_data['total'] - genre_data['liked']
-
-    genre_data.rename(columns={'genres': 'genre'}, inplace=True)
-
-    genre_examples = exploded.groupby('genres').apply(
-        lambda x: x.nlargest(3, 'num_watched')['title'].tolist()
+    genre_data['examples'] = format_lists_with_linebreaks(genre_data['examples'])
+    genre_data['favourites'] = np.where(
+        genre_data['favourites'].str.len() > 0,
+        hover_field('Your Favourites', format_lists_with_linebreaks(genre_data['favourites']), BLUE),
+        ''
     )
-    genre_favourites = exploded.dropna(subset=['rating']).groupby('genres').apply(
-        lambda x: x.sort_values('rating', ascending=False).head(3)['title'].tolist()
-    )
-
-    genre_data = genre_data.merge(
-        genre_examples.rename('examples'),
-        left_on='genre',
-        right_index=True
-    ).merge(
-        genre_favourites.rename('favourites'),
-        left_on='genre',
-        right_index=True,
-        how='left'
-    )
-
-    genre_data['hover_text'] = genre_data.apply(
-        lambda row: (
-            f"<span style='color:{BLUE}'><b>Number of Films:</b></span> {row['total']}<br>" +
-            f"<span style='color:{BLUE}'><b>Liked:</b></span> {row['liked']} "
-            f"({round(100 * row['liked'] / row['total'])}%)<br>" +
-            f"<span style='color:{BLUE}'><b>Examples:</b></span> {format_with_linebreaks(row['examples'])}<br>" +
-            (
-                f"<span style='color:{BLUE}'><b>Your Favourites:</b></span> {format_with_linebreaks(row['favourites'])}"
-                if isinstance(row['favourites'], list) and row['favourites'] else ""
-            )
-        ),
-        axis=1
+    hover_columns = ['total', 'liked', 'liked_pct', 'examples', 'favourites']
+    hover_template = (
+        hover_label('Number of Films', BLUE) + "%{customdata[0]}<br>" +
+        hover_label('Liked', BLUE) + "%{customdata[1]} (%{customdata[2]}%)<br>" +
+        hover_label('Examples', BLUE) + "%{customdata[3]}<br>%{customdata[4]}<extra></extra>"
     )
 
     genre_data = genre_data.sort_values('total', ascending=True)
@@ -56,8 +32,8 @@ def plot_popular_genres(films_df: pd.DataFrame):
         name='Not Liked',
         orientation='h',
         marker_color='white',
-        customdata=genre_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=genre_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.add_trace(go.Bar(
@@ -66,8 +42,8 @@ def plot_popular_genres(films_df: pd.DataFrame):
         name='Liked',
         orientation='h',
         marker_color=BLUE,
-        customdata=genre_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=genre_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.update_layout(
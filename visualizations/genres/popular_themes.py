@@ -1,51 +1,27 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, ORANGE, GRAY
+import numpy as np
+from dataset.entities import FilmEntities
+from dataset.aggregations import summarize_entities
+from utils import format_lists_with_linebreaks, hover_label, hover_field, ORANGE, GRAY
 
-def plot_popular_themes(films_df: pd.DataFrame):
-    exploded = films_df.explode('themes')
-    exploded = exploded.dropna(subset=['themes'])
-
-    theme_counts = exploded.groupby('themes').size().reset_index(name='total')
-    liked_counts = exploded[exploded['liked']].groupby('themes').size().reset_index(name='liked')
-    theme_data = pd.merge(theme_counts, liked_counts, on='themes', how='left').fillna(0)
-    theme_data['liked'] = theme_data['liked'].astype(int)
-    theme_data['unliked'] = theme_data['total'] - theme_data['liked']
-
-    theme_data.rename(columns={'themes': 'theme'}, inplace=True)
-
-    theme_examples = exploded.groupby('themes').apply(
-        lambda x: x.nlargest(3, 'num_watched')['title'].tolist()
-    )
-    theme_favourites = exploded.dropna(subset=['rating']).groupby('themes').apply(
-        lambda x: x.sort_values('rating', ascending=False).head(3)['title'].tolist()
-    )
-
-    theme_data = theme_data.merge(
-        theme_examples.rename('examples'),
-        left_on='theme',
-        right_index=True
-    ).merge(
-        theme_favourites.rename('favourites'),
-        left_on='theme',
-        right_index=True,
-        how='left'
-    )
+def plot_popular_themes(films_df: pd.DataFrame, film_entities: FilmEntities):
+    rows = film_entities.rows(films_df, 'themes', ['liked', 'title', 'num_watched_rank', 'rating_rank'])
+    theme_data = summarize_entities(rows, 'themes').rename(columns={'themes': 'theme'})
 
     theme_data = theme_data.nlargest(20, 'total')
 
-    theme_data['hover_text'] = theme_data.apply(
-        lambda row: (
-            f"<span style='color:{ORANGE}'><b>Number of Films:</b></span> {row['total']}<br>" +
-            f"<span style='color:{ORANGE}'><b>Liked:</b></span> {row['liked']} "
-            f"({round(100 * row['liked'] / row['total'])}%)<br>" +
-            f"<span style='color:{ORANGE}'><b>Examples:</b></span> {format_with_linebreaks(row['examples'])}<br>" +
-            (
-                f"<span style='color:{ORANGE}'><b>Your Favourites:</b></span> {format_with_linebreaks(row['favourites'])}"
-                if isinstance(row['favourites'], list) and row['favourites'] else ""
-            )
-        ),
-        axis=1
+    theme_data['examples'] = format_lists_with_linebreaks(theme_data['examples'])
+    theme_data['favourites'] = np.where(
+        theme_data['favourites'].str.len() > 0,
+        hover_field('Your Favourites', format_lists_with_linebreaks(theme_data['favourites']), ORANGE),
+        ''
+    )
+    hover_columns = ['total', 'liked', 'liked_pct', 'examples', 'favourites']
+    hover_template = (
+        hover_label('Number of Films', ORANGE) + "%{customdata[0]}<br>" +
+        hover_label('Liked', ORANGE) + "%{customdata[1]} (%{customdata[2]}%)<br>" +
+        hover_label('Examples', ORANGE) + "%{customdata[3]}<br>%{customdata[4]}<extra></extra>"
     )
 
     theme_data = theme_data.sort_values('total', ascending=True)
@@ -58,8 +34,8 @@ def plot_popular_themes(films_df: pd.DataFrame):
         name='Not Liked',
         orientation='h',
         marker_color='white',
-        customdata=theme_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=theme_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.add_trace(go.Bar(
@@ -68,8 +44,8 @@ def plot_popular_themes(films_df: pd.DataFrame):
         name='Liked',
         orientation='h',
         marker_color=ORANGE,
-        customdata=theme_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=theme_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.update_layout(
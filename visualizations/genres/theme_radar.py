@@ -1,9 +1,11 @@
 import pandas as pd
 import plotly.graph_objects as go
+import numpy as np
+from dataset.entities import FilmEntities
 from utils import ORANGE, GRAY
 
-def plot_theme_rating_radar(films_df: pd.DataFrame, top_n: int = 18):
-    exploded = films_df.explode('themes')
+def plot_theme_rating_radar(films_df: pd.DataFrame, film_entities: FilmEntities, top_n: int = 18):
+    exploded = film_entities.rows(films_df, 'themes', ['rating', 'avg_rating'])
     exploded = exploded.dropna(subset=['themes', 'rating', 'avg_rating'])
 
     theme_counts = exploded['themes'].value_counts()
@@ -30,15 +32,12 @@ def plot_theme_rating_radar(films_df: pd.DataFrame, top_n: int = 18):
     )
 
     categories = avg_ratings.index.tolist()
-    values = avg_ratings.tolist()
-    community_values = community_avg_ratings.tolist()
-    counts = film_counts.tolist()
-
     # Close the radar loop
     categories.append(categories[0])
-    values.append(values[0])
-    community_values.append(community_values[0])
-    counts.append(counts[0])
+    loop = np.append(np.arange(len(avg_ratings)), 0)
+    values = avg_ratings.to_numpy(dtype=float)[loop]
+    community_values = community_avg_ratings.to_numpy(dtype=float)[loop]
+    counts = film_counts.to_numpy()[loop]
 
     fig = go.Figure()
 
@@ -49,10 +48,10 @@ def plot_theme_rating_radar(films_df: pd.DataFrame, top_n: int = 18):
         name='Community Ratings',
         line=dict(color='white', width=2),
         marker=dict(size=6),
-        customdata=[[cat, val, cnt] for cat, val, cnt in zip(categories, community_values, counts)],
-        hovertemplate="<b>Theme:</b> %{customdata[0]}<br>" +
-                      "<b>Average Rating:</b> %{customdata[1]:.2f}<br>" +
-                      "<b>Number of Films:</b> %{customdata[2]}<extra></extra>",
+        customdata=np.column_stack([community_values, counts]),
+        hovertemplate="<b>Theme:</b> %{theta}<br>" +
+                      "<b>Average Rating:</b> %{customdata[0]:.2f}<br>" +
+                      "<b>Number of Films:</b> %{customdata[1]}<extra></extra>",
         visible='legendonly'
     ))
 
@@ -63,10 +62,10 @@ def plot_theme_rating_radar(films_df: pd.DataFrame, top_n: int = 18):
         name='Your Ratings',
         line=dict(color=ORANGE),
         marker=dict(size=6),
-        customdata=[[cat, val, cnt] for cat, val, cnt in zip(categories, values, counts)],
-        hovertemplate="<span style='color:" + ORANGE + "'><b>Theme:</b></span> %{customdata[0]}<br>" +
-                      "<span style='color:" + ORANGE + "'><b>Average Rating:</b></span> %{customdata[1]:.2f}<br>" +
-                      "<span style='color:" + ORANGE + "'><b>Number of Films:</b></span> %{customdata[2]}<extra></extra>"
+        customdata=np.column_stack([values, counts]),
+        hovertemplate="<span style='color:" + ORANGE + "'><b>Theme:</b></span> %{theta}<br>" +
+                      "<span style='color:" + ORANGE + "'><b>Average Rating:</b></span> %{customdata[0]:.2f}<br>" +
+                      "<span style='color:" + ORANGE + "'><b>Number of Films:</b></span> %{customdata[1]}<extra></extra>"
     ))
 
     fig.update_layout(
@@ -1,36 +1,27 @@
 import pandas as pd
 import plotly.express as px
 import numpy as np
-from utils import format_with_linebreaks, ORANGE, GRAY
+from dataset.entities import FilmEntities
+from dataset.aggregations import top_titles
+from utils import format_lists_with_linebreaks, hover_label, hover_field, ORANGE, GRAY
 
-def plot_popular_countries_map(films_df: pd.DataFrame):
-    exploded = films_df.explode('countries')
+def plot_popular_countries_map(films_df: pd.DataFrame, film_entities: FilmEntities):
+    exploded = film_entities.rows(films_df, 'countries', ['title', 'num_watched_rank'])
     exploded = exploded.dropna(subset=['countries'])
 
     country_counts = exploded['countries'].value_counts().reset_index()
     country_counts.columns = ['country', 'count']
     country_counts['log_count'] = np.log1p(country_counts['count'])
 
-    country_examples = (
-        exploded.groupby('countries')
-        .apply(lambda x: x.nlargest(3, 'num_watched')['title'].tolist())
-        .rename('examples')
-        .reset_index()
-    )
+    country_examples = top_titles(exploded, 'countries', 'num_watched').rename('examples').reset_index()
 
     country_counts = country_counts.merge(country_examples, left_on='country', right_on='countries', how='left')
-    country_counts['examples'] = country_counts['examples'].fillna('').apply(format_with_linebreaks)
+    country_counts['examples'] = format_lists_with_linebreaks(country_counts['examples'])
 
-    country_counts['hover_text'] = country_counts.apply(
-        lambda row: (
-            f"<span style='color:{ORANGE}'><b>Country:</b></span> {row['country']}<br>" +
-            f"<span style='color:{ORANGE}'><b>Number of Films:</b></span> {row['count']}<br>" +
-            (
-                f"<span style='color:{ORANGE}'><b>Examples:</b></span> {row['examples']}"
-                if row['examples'] else ""
-            )
-        ),
-        axis=1
+    country_counts['examples'] = np.where(
+        country_counts['examples'] != '',
+        hover_field('Examples', country_counts['examples'], ORANGE),
+        ''
     )
 
     fig = px.choropleth(
@@ -44,8 +35,11 @@ def plot_popular_countries_map(films_df: pd.DataFrame):
     )
 
     fig.update_traces(
-        customdata=country_counts[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=country_counts[['count', 'examples']],
+        hovertemplate=(
+            hover_label('Country', ORANGE) + "%{location}<br>" +
+            hover_label('Number of Films', ORANGE) + "%{customdata[0]}<br>%{customdata[1]}<extra></extra>"
+        )
     )
 
     fig.update_layout(
@@ -1,46 +1,23 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, BLUE, GRAY
+import numpy as np
+from dataset.aggregations import summarize_entities
+from utils import format_lists_with_linebreaks, hover_label, hover_field, BLUE, GRAY
 
 def plot_popular_languages(films_df: pd.DataFrame):
-    filtered = films_df.dropna(subset=['language'])
+    language_data = summarize_entities(films_df, 'language')
 
-    language_counts = filtered.groupby('language').size().reset_index(name='total')
-    liked_counts = filtered[filtered['liked']].groupby('language').size().reset_index(name='liked')
-    language_data = pd.merge(language_counts, liked_counts, on='language', how='left').fillna(0)
-    language_data['liked'] = language_data['liked'].astype(int)
-    language_data['unliked'] = language_data['total'] - language_data['liked']
-
-    language_examples = filtered.groupby('language').apply(
-        lambda x: x.nlargest(3, 'num_watched')['title'].tolist()
-    )
-    language_favourites = filtered.dropna(subset=['rating']).groupby('language').apply(
-        lambda x: x.sort_values('rating', ascending=False).head(3)['title'].tolist()
-    )
-
-    language_data = language_data.merge(
-        language_examples.rename('examples'),
-        left_on='language',
-        right_index=True
-    ).merge(
-        language_favourites.rename('favourites'),
-        left_on='language',
-        right_index=True,
-        how='left'
+    language_data['examples'] = format_lists_with_linebreaks(language_data['examples'])
+    language_data['favourites'] = np.where(
+        language_data['favourites'].str.len() > 0,
+        hover_field('Your Favourites', format_lists_with_linebreaks(language_data['favourites']), BLUE),
+        ''
     )
-
-    language_data['hover_text'] = language_data.apply(
-        lambda row: (
-            f"<span style='color:{BLUE}'><b>Number of Films:</b></span> {row['total']}<br>" +
-            f"<span style='color:{BLUE}'><b>Liked:</b></span> {row['liked']} "
-            f"({round(100 * row['liked'] / row['total'])}%)<br>" +
-            f"<span style='color:{BLUE}'><b>Examples:</b></span> {format_with_linebreaks(row['examples'])}<br>" +
-            (
-                f"<span style='color:{BLUE}'><b>Your Favourites:</b></span> {format_with_linebreaks(row['favourites'])}"
-                if isinstance(row['favourites'], list) and row['favourites'] else ""
-            )
-        ),
-        axis=1
+    hover_columns = ['total', 'liked', 'liked_pct', 'examples', 'favourites']
+    hover_template = (
+        hover_label('Number of Films', BLUE) + "%{customdata[0]}<br>" +
+        hover_label('Liked', BLUE) + "%{customdata[1]} (%{customdata[2]}%)<br>" +
+        hover_label('Examples', BLUE) + "%{customdata[3]}<br>%{customdata[4]}<extra></extra>"
     )
 
     language_data = language_data.sort_values('total', ascending=True)
@@ -53,8 +30,8 @@ def plot_popular_languages(films_df: pd.DataFrame):
         name='Not Liked',
         orientation='h',
         marker_color='white',
-        customdata=language_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=language_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.add_trace(go.Bar(
@@ -63,8 +40,8 @@ def plot_popular_languages(films_df: pd.DataFrame):
         name='Liked',
         orientation='h',
         marker_color=BLUE,
-        customdata=language_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=language_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.update_layout(
@@ -1,51 +1,37 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, format_number, ORANGE, GRAY
+import numpy as np
+from dataset.aggregations import top_titles
+from utils import format_lists_with_linebreaks, hover_label, format_numbers, ORANGE, GRAY
 
 def plot_liked_histogram(films_df: pd.DataFrame):
     df = films_df.dropna(subset=['num_liked']).copy()
 
     counts, bin_edges = pd.cut(df['num_liked'], bins=40, retbins=True)
-    bin_ranges = [
-        f"{format_number(bin_edges[i])} - {format_number(bin_edges[i+1])}"
-        for i in range(len(bin_edges)-1)
-    ]
+    bin_ranges = format_numbers(bin_edges[:-1]) + " - " + format_numbers(bin_edges[1:])
 
     df['bin'] = pd.cut(df['num_liked'], bins=bin_edges)
-    bin_examples = df.groupby('bin', observed=False).apply(
-        lambda x: x.nlargest(3, 'num_liked')['title'].tolist()
-    )
-    bin_examples = bin_examples.reindex(df['bin'].cat.categories)
+    bin_examples = top_titles(df, 'bin', 'num_liked', index=df['bin'].cat.categories)
 
     bin_counts = df['bin'].value_counts().sort_index()
 
-    hover_texts = []
-    for i in range(len(bin_ranges)):
-        examples = bin_examples.iloc[i] if i < len(bin_examples) else []
-        count = bin_counts.iloc[i] if i < len(bin_counts) else 0
-
-        hover_text = (
-            f"<span style='color:{ORANGE}'><b>Number of Likes:</b></span> {bin_ranges[i]}<br>"
-            f"<span style='color:{ORANGE}'><b>Number of Films:</b></span> {format_number(count)}<br>"
-            f"<span style='color:{ORANGE}'><b>Examples:</b></span> {format_with_linebreaks(examples)}"
-        )
-        hover_texts.append(hover_text)
+    hover_data = np.column_stack([bin_ranges, format_numbers(bin_counts), format_lists_with_linebreaks(bin_examples)])
 
     fig = go.Figure()
 
-    fig.add_trace(go.Histogram(
-        x=df['num_liked'],
-        xbins=dict(
-            start=bin_edges[0],
-            end=bin_edges[-1],
-            size=(bin_edges[-1] - bin_edges[0]) / 40
-        ),
+    fig.add_trace(go.Bar(
+        x=(bin_edges[:-1] + bin_edges[1:]) / 2,
+        y=bin_counts,
         marker=dict(
             color=ORANGE,
         ),
         name='Like Distribution',
-        customdata=hover_texts,
-        hovertemplate="%{customdata}<extra></extra>"
+        customdata=hover_data,
+        hovertemplate=(
+            hover_label('Number of Likes', ORANGE) + "%{customdata[0]}<br>" +
+            hover_label('Number of Films', ORANGE) + "%{customdata[1]}<br>" +
+            hover_label('Examples', ORANGE) + "%{customdata[2]}<extra></extra>"
+        )
     ))
 
     fig.update_layout(
@@ -1,51 +1,37 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, format_number, BLUE, GRAY
+import numpy as np
+from dataset.aggregations import top_titles
+from utils import format_lists_with_linebreaks, hover_label, format_numbers, BLUE, GRAY
 
 def plot_members_histogram(films_df: pd.DataFrame):
     df = films_df.dropna(subset=['num_watched']).copy()
     
     counts, bin_edges = pd.cut(df['num_watched'], bins=40, retbins=True)
-    bin_ranges = [
-        f"{format_number(bin_edges[i])} - {format_number(bin_edges[i+1])}"
-        for i in range(len(bin_edges)-1)
-    ]
+    bin_ranges = format_numbers(bin_edges[:-1]) + " - " + format_numbers(bin_edges[1:])
     
     df['bin'] = pd.cut(df['num_watched'], bins=bin_edges)
-    bin_examples = df.groupby('bin', observed=False).apply(
-        lambda x: x.nlargest(3, 'num_watched')['title'].tolist()
-    )
-    bin_examples = bin_examples.reindex(df['bin'].cat.categories)
+    bin_examples = top_titles(df, 'bin', 'num_watched', index=df['bin'].cat.categories)
 
     bin_counts = df['bin'].value_counts().sort_index()
 
-    hover_texts = []
-    for i in range(len(bin_ranges)):
-        examples = bin_examples.iloc[i] if i < len(bin_examples) else []
-        count = bin_counts.iloc[i] if i < len(bin_counts) else 0
-
-        hover_text = (
-            f"<span style='color:{BLUE}'><b>People Watched:</b></span> {bin_ranges[i]}<br>"
-            f"<span style='color:{BLUE}'><b>Number of Films:</b></span> {format_number(count)}<br>"
-            f"<span style='color:{BLUE}'><b>Examples:</b></span> {format_with_linebreaks(examples)}"
-        )
-        hover_texts.append(hover_text)
+    hover_data = np.column_stack([bin_ranges, format_numbers(bin_counts), format_lists_with_linebreaks(bin_examples)])
     
     fig = go.Figure()
     
-    fig.add_trace(go.Histogram(
-        x=df['num_watched'],
-        xbins=dict(
-            start=bin_edges[0],
-            end=bin_edges[-1],
-            size=(bin_edges[-1] - bin_edges[0])/40
-        ),
+    fig.add_trace(go.Bar(
+        x=(bin_edges[:-1] + bin_edges[1:]) / 2,
+        y=bin_counts,
         marker=dict(
             color=BLUE,
         ),
         name='Popularity Distribution',
-        customdata=hover_texts,
-        hovertemplate="%{customdata}<extra></extra>"
+        customdata=hover_data,
+        hovertemplate=(
+            hover_label('People Watched', BLUE) + "%{customdata[0]}<br>" +
+            hover_label('Number of Films', BLUE) + "%{customdata[1]}<br>" +
+            hover_label('Examples', BLUE) + "%{customdata[2]}<extra></extra>"
+        )
     ))
     
     fig.update_layout(
@@ -0,0 +1,45 @@
+import json
+import streamlit as st
+
+# st.plotly_chart takes a figure and converts and serializes it on every rerun. on the
+# streamlit releases below, a chart whose spec is already serialized is sent as the same
+# element st.plotly_chart(fig, use_container_width=True) would send, built through
+# streamlit internals. any other release, or one missing those internals, falls back to
+# st.plotly_chart
+SPEC_STREAMLIT_VERSIONS = ('1.44',)
+
+try:
+    if '.'.join(st.__version__.split('.')[:2]) not in SPEC_STREAMLIT_VERSIONS:
+        raise ImportError(f"streamlit {st.__version__} isn't a release draw_figure was checked against")
+    from streamlit.elements.lib.form_utils import current_form_id
+    from streamlit.elements.lib.utils import compute_and_register_element_id
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+    DRAW_SPECS = True
+except ImportError:
+    DRAW_SPECS = False
+
+def draw_figure(container, fig, spec):
+    # spec is plotly.io.to_json(fig, validate=False). fig is only used by the fallback, and
+    # the figure cache stores None in its place when DRAW_SPECS is set
+    if not DRAW_SPECS:
+        container.plotly_chart(fig, use_container_width=True)
+        return
+
+    proto = PlotlyChartProto()
+    proto.use_container_width = True
+    proto.theme = "streamlit"
+    proto.form_id = current_form_id(container)
+    proto.spec = spec
+    proto.config = json.dumps({"showLink": False, "linkText": False})
+    proto.id = compute_and_register_element_id(
+        "plotly_chart",
+        user_key=None,
+        form_id=proto.form_id,
+        plotly_spec=proto.spec,
+        plotly_config=proto.config,
+        selection_mode=("points", "box", "lasso"),
+        is_selection_activated=False,
+        theme="streamlit",
+        use_container_width=True,
+    )
+    container._enqueue("plotly_chart", proto)
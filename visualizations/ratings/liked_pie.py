@@ -1,6 +1,7 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import ORANGE, GRAY
+import numpy as np
+from utils import hover_label, ORANGE, GRAY
 
 def plot_liked_pie(films_df: pd.DataFrame):
     liked_count = films_df['liked'].sum()
@@ -8,22 +9,18 @@ def plot_liked_pie(films_df: pd.DataFrame):
     total = len(films_df)
 
     labels = ['Liked', 'Not Liked']
-    values = [liked_count, not_liked_count]
-    percentages = [round(liked_count / total * 100), round(not_liked_count / total * 100)]
-    custom_text = [
-        f"<span style='color:{ORANGE}'><b>Liked:</b></span> {liked_count} ({percentages[0]}%)",
-        f"<span style='color:{ORANGE}'><b>Not Liked:</b></span> {not_liked_count} ({percentages[1]}%)"
-    ]
+    values = np.array([liked_count, not_liked_count])
+    percentages = np.round(values / total * 100).astype(int)
 
     fig = go.Figure(data=[go.Pie(
         labels=labels,
         values=values,
         marker=dict(colors=[ORANGE, GRAY]),
         textinfo='label',
-        pull=[0.1, 0],
+        pull=np.array([0.1, 0]),
         hoverinfo='skip',
-        customdata=custom_text,
-        hovertemplate="%{customdata}<extra></extra>"
+        customdata=np.column_stack([values, percentages]),
+        hovertemplate=hover_label('%{label}', ORANGE) + "%{customdata[0]} (%{customdata[1]}%)<extra></extra>"
     )])
 
     fig.update_layout(
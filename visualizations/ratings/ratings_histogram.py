@@ -1,6 +1,6 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import BLUE, GRAY
+from utils import hover_label, BLUE, GRAY
 import numpy as np
 
 def plot_ratings_histogram(films_df: pd.DataFrame, selected_genres=None):
@@ -10,26 +10,18 @@ def plot_ratings_histogram(films_df: pd.DataFrame, selected_genres=None):
     bins = np.arange(0.5, 5.6, 0.5)
     counts, bin_edges = np.histogram(df['rating'], bins=bins)
 
-    hover_texts = [
-        f"<span style='color:{BLUE}'><b>Rating:</b></span> {(bin_edges[i+1] - 0.5):.1f}<br>"
-        f"<span style='color:{BLUE}'><b>Number of Films:</b></span> {counts[i]}"
-        for i in range(len(counts))
-    ]
-
     fig = go.Figure()
 
-    fig.add_trace(go.Histogram(
-        x=df['rating'],
-        xbins=dict(
-            start=0.5,
-            end=5.5,
-            size=0.5
-        ),
+    fig.add_trace(go.Bar(
+        x=(bin_edges[:-1] + bin_edges[1:]) / 2,
+        y=counts,
         marker=dict(color=BLUE),
         name='Rating Distribution',
-        hovertext=hover_texts,
-        hovertemplate="%{hovertext}<extra></extra>",
-        autobinx=False
+        customdata=np.column_stack([bin_edges[1:] - 0.5, counts]),
+        hovertemplate=(
+            hover_label('Rating', BLUE) + "%{customdata[0]:.1f}<br>" +
+            hover_label('Number of Films', BLUE) + "%{customdata[1]}<extra></extra>"
+        )
     ))
 
     fig.update_layout(
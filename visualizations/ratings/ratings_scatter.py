@@ -1,7 +1,7 @@
 import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
-from utils import BLUE, GRAY, DARK_GRAY
+from utils import hover_label, text, scatter_trace, BLUE, GRAY, DARK_GRAY
 
 def plot_ratings_scatter(films_df: pd.DataFrame, selected_genres=None):
     # drop films without both ratings
@@ -10,24 +10,18 @@ def plot_ratings_scatter(films_df: pd.DataFrame, selected_genres=None):
     df = df.sort_values(by='rating', ascending=False)
 
     # add small random jitter to prevent overlapping
-    np.random.seed(42)    # for reproducible jitter
+    rng = np.random.RandomState(42)    # reproducible jitter; its own generator since charts build concurrently
     jitter_amount = 0.02  # small random noise
     
-    df['avg_rating_jittered'] = df['avg_rating'] + np.random.normal(0, jitter_amount, len(df))
-    df['rating_jittered'] = df['rating'] + np.random.normal(0, jitter_amount, len(df))
+    df['avg_rating_jittered'] = (df['avg_rating'] + rng.normal(0, jitter_amount, len(df))).astype('float32')
+    df['rating_jittered'] = (df['rating'] + rng.normal(0, jitter_amount, len(df))).astype('float32')
 
-    df['hover_text'] = df.apply(
-        lambda row: (
-            f"<span style='color:{BLUE}'><b>Film:</b></span> {row['title']} ({row['year'] or 'N/A'})<br>"
-            f"<span style='color:{BLUE}'><b>Your Rating:</b></span> {row['rating']}<br>"
-            f"<span style='color:{BLUE}'><b>Avg Rating:</b></span> {row['avg_rating']}<br>"
-        ),
-        axis=1
-    )
+    df['year_text'] = np.where(df['year'].fillna(0) != 0, text(df['year']), 'N/A')
+    df['avg_rating_text'] = text(df['avg_rating'])
 
     fig = go.Figure()
 
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter_trace(len(df))(
         x=df['avg_rating_jittered'],
         y=df['rating_jittered'],
         mode='markers',
@@ -37,8 +31,12 @@ def plot_ratings_scatter(films_df: pd.DataFrame, selected_genres=None):
             opacity=0.9,
             line=dict(width=1, color=DARK_GRAY)
         ),
-        text=df['hover_text'],
-        hovertemplate="%{text}<extra></extra>",
+        customdata=df[['title', 'year_text', 'rating', 'avg_rating_text']],
+        hovertemplate=(
+            hover_label('Film', BLUE) + "%{customdata[0]} (%{customdata[1]})<br>" +
+            hover_label('Your Rating', BLUE) + "%{customdata[2]:.1f}<br>" +
+            hover_label('Avg Rating', BLUE) + "%{customdata[3]}<br><extra></extra>"
+        ),
         name='Films'
     ))
     
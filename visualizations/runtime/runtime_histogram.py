@@ -1,55 +1,40 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, BLUE, GRAY
+import numpy as np
+from dataset.aggregations import top_titles
+from utils import format_lists_with_linebreaks, hover_label, text, BLUE, GRAY
 
 def plot_runtime_histogram(films_df: pd.DataFrame):
     df = films_df.dropna(subset=['runtime'])
 
     df = df[(df['runtime'] >= 20) & (df['runtime'] <= 300)]
 
-    bin_edges = list(range(20, 301, 10))
-    bin_ranges = [
-        f"{bin_edges[i]} - {bin_edges[i+1]}"
-        for i in range(len(bin_edges)-1)
-    ]
+    bin_edges = np.arange(20, 301, 10)
+    bin_ranges = text(bin_edges[:-1]) + " - " + text(bin_edges[1:])
 
     df['bin'] = pd.cut(df['runtime'], bins=bin_edges, right=False)
     
     bin_counts = df['bin'].value_counts().sort_index()
     
-    bin_examples = df.groupby('bin', observed=False).apply(
-        lambda x: x.nlargest(3, 'num_watched')['title'].tolist()
-    )
-    bin_examples = bin_examples.reindex(df['bin'].cat.categories, fill_value=[])
+    bin_examples = top_titles(df, 'bin', 'num_watched', index=df['bin'].cat.categories)
 
-    hover_texts = []
-    for i, bin_range in enumerate(bin_ranges):
-        count = bin_counts.get(df['bin'].cat.categories[i], 0)
-        
-        examples = bin_examples.get(df['bin'].cat.categories[i], [])
-        
-        hover_text = (
-            f"<span style='color:{BLUE}'><b>Runtime:</b></span> {bin_range}<br>"
-            f"<span style='color:{BLUE}'><b>Number of Films:</b></span> {count}<br>"
-            f"<span style='color:{BLUE}'><b>Examples:</b></span> {format_with_linebreaks(examples)}"
-        )
-        hover_texts.append(hover_text)
+    hover_data = np.column_stack([bin_ranges, bin_counts.reindex(df['bin'].cat.categories, fill_value=0), format_lists_with_linebreaks(bin_examples)])
 
     fig = go.Figure()
 
-    fig.add_trace(go.Histogram(
-        x=df['runtime'],
-        xbins=dict(
-            start=20,
-            end=300,
-            size=10
-        ),
+    fig.add_trace(go.Bar(
+        x=(bin_edges[:-1] + bin_edges[1:]) / 2,
+        y=bin_counts,
         marker=dict(
             color=BLUE,
         ),
         name='Runtime Distribution',
-        customdata=hover_texts,
-        hovertemplate="%{customdata}<extra></extra>"
+        customdata=hover_data,
+        hovertemplate=(
+            hover_label('Runtime', BLUE) + "%{customdata[0]}<br>" +
+            hover_label('Number of Films', BLUE) + "%{customdata[1]}<br>" +
+            hover_label('Examples', BLUE) + "%{customdata[2]}<extra></extra>"
+        )
     ))
 
     fig.update_layout(
@@ -1,6 +1,7 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import BLUE, GRAY, DARK_GRAY
+import numpy as np
+from utils import hover_label, text, scatter_trace, BLUE, GRAY, DARK_GRAY
 
 def plot_runtime_scatter(films_df: pd.DataFrame, selected_genres=None):
     # drop films without runtime or rating
@@ -16,18 +17,11 @@ def plot_runtime_scatter(films_df: pd.DataFrame, selected_genres=None):
     df = df[(df['runtime'] >= lower_bound) & (df['runtime'] <= upper_bound)]
     df = df.sort_values(by='rating', ascending=False)
 
-    df['hover_text'] = df.apply(
-        lambda row: (
-            f"<span style='color:{BLUE}'><b>Film:</b></span> {row['title']} ({row['year'] or 'N/A'})<br>"
-            f"<span style='color:{BLUE}'><b>Runtime:</b></span> {row['runtime']} min<br>"
-            f"<span style='color:{BLUE}'><b>Your Rating:</b></span> {row['rating']}<br>"
-        ),
-        axis=1
-    )
+    df['year_text'] = np.where(df['year'].fillna(0) != 0, text(df['year']), 'N/A')
 
     fig = go.Figure()
 
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter_trace(len(df))(
         x=df['runtime'],
         y=df['rating'],
         mode='markers',
@@ -37,8 +31,12 @@ def plot_runtime_scatter(films_df: pd.DataFrame, selected_genres=None):
             opacity=0.9,
             line=dict(width=1, color=DARK_GRAY)
         ),
-        text=df['hover_text'],
-        hovertemplate="%{text}<extra></extra>",
+        customdata=df[['title', 'year_text']],
+        hovertemplate=(
+            hover_label('Film', BLUE) + "%{customdata[0]} (%{customdata[1]})<br>" +
+            hover_label('Runtime', BLUE) + "%{x} min<br>" +
+            hover_label('Your Rating', BLUE) + "%{y:.1f}<br><extra></extra>"
+        ),
         name='Films'
     ))
 
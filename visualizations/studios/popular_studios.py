@@ -1,49 +1,25 @@
 import pandas as pd
 import plotly.graph_objects as go
-from utils import format_with_linebreaks, BLUE, GRAY
+import numpy as np
+from dataset.entities import FilmEntities
+from dataset.aggregations import summarize_entities
+from utils import format_lists_with_linebreaks, hover_label, hover_field, BLUE, GRAY
 
-def plot_popular_studios(films_df: pd.DataFrame):
-    exploded = films_df.explode('studios')
-    exploded = exploded.dropna(subset=['studios'])
+def plot_popular_studios(films_df: pd.DataFrame, film_entities: FilmEntities):
+    rows = film_entities.rows(films_df, 'studios', ['liked', 'title', 'num_watched_rank', 'rating_rank'])
+    studio_data = summarize_entities(rows, 'studios').rename(columns={'studios': 'studio'})
 
-    studio_counts = exploded.groupby('studios').size().reset_index(name='total')
-    liked_counts = exploded[exploded['liked']].groupby('studios').size().reset_index(name='liked')
-    studio_data = pd.merge(studio_counts, liked_counts, on='studios', how='left').fillna(0)
-    studio_data['liked'] = studio_data['liked'].astype(int)
-    studio_data['unliked'] = studio_data['total'] - studio_data['liked']
-
-    studio_data.rename(columns={'studios': 'studio'}, inplace=True)
-
-    studio_examples = exploded.groupby('studios').apply(
-        lambda x: x.nlargest(3, 'num_watched')['title'].tolist()
+    studio_data['examples'] = format_lists_with_linebreaks(studio_data['examples'])
+    studio_data['favourites'] = np.where(
+        studio_data['favourites'].str.len() > 0,
+        hover_field('Your Favourites', format_lists_with_linebreaks(studio_data['favourites']), BLUE),
+        ''
     )
-    studio_favourites = exploded.dropna(subset=['rating']).groupby('studios').apply(
-        lambda x: x.sort_values('rating', ascending=False).head(3)['title'].tolist()
-    )
-
-    studio_data = studio_data.merge(
-        studio_examples.rename('examples'),
-        left_on='studio',
-        right_index=True
-    ).merge(
-        studio_favourites.rename('favourites'),
-        left_on='studio',
-        right_index=True,
-        how='left'
-    )
-
-    studio_data['hover_text'] = studio_data.apply(
-        lambda row: (
-            f"<span style='color:{BLUE}'><b>Number of Films:</b></span> {row['total']}<br>" +
-            f"<span style='color:{BLUE}'><b>Liked:</b></span> {row['liked']} "
-            f"({round(100 * row['liked'] / row['total'])}%)<br>" +
-            f"<span style='color:{BLUE}'><b>Examples:</b></span> {format_with_linebreaks(row['examples'])}<br>" +
-            (
-                f"<span style='color:{BLUE}'><b>Your Favourites:</b></span> {format_with_linebreaks(row['favourites'])}"
-                if isinstance(row['favourites'], list) and row['favourites'] else ""
-            )
-        ),
-        axis=1
+    hover_columns = ['total', 'liked', 'liked_pct', 'examples', 'favourites']
+    hover_template = (
+        hover_label('Number of Films', BLUE) + "%{customdata[0]}<br>" +
+        hover_label('Liked', BLUE) + "%{customdata[1]} (%{customdata[2]}%)<br>" +
+        hover_label('Examples', BLUE) + "%{customdata[3]}<br>%{customdata[4]}<extra></extra>"
     )
 
     studio_data = studio_data.sort_values('total', ascending=True).tail(20)
@@ -56,8 +32,8 @@ def plot_popular_studios(films_df: pd.DataFrame):
         name='Not Liked',
         orientation='h',
         marker_color='white',
-        customdata=studio_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=studio_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.add_trace(go.Bar(
@@ -66,8 +42,8 @@ def plot_popular_studios(films_df: pd.DataFrame):
         name='Liked',
         orientation='h',
         marker_color=BLUE,
-        customdata=studio_data[['hover_text']],
-        hovertemplate="%{customdata[0]}<extra></extra>"
+        customdata=studio_data[hover_columns],
+        hovertemplate=hover_template
     ))
 
     fig.update_layout(